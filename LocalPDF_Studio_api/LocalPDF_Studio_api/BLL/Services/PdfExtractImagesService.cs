@@ -18,7 +18,9 @@
 
 using System.Diagnostics;
 using System.Runtime.InteropServices;
+using System.Text;
 using System.Text.Json;
+using System.Text.Json.Nodes;
 using LocalPDF_Studio_api.BLL.Interfaces;
 using LocalPDF_Studio_api.DAL.Models.PdfExtractImages;
 
@@ -70,6 +72,12 @@ namespace LocalPDF_Studio_api.BLL.Services
                 }
                 else // remove mode
                 {
+                    if (pythonResult.PdfBytes != null && pythonResult.PdfBytes.Length > 0)
+                    {
+                        _logger.LogInformation($"Successfully removed images from {pythonResult.ProcessedPages} pages. PDF size: {pythonResult.PdfBytes.Length} bytes");
+                        return pythonResult.PdfBytes;
+                    }
+
                     _logger.LogInformation($"DEBUG: PdfData length: {pythonResult.PdfData?.Length ?? 0}");
                     _logger.LogInformation($"DEBUG: First 100 chars of PdfData: {pythonResult.PdfData?.Substring(0, Math.Min(100, pythonResult.PdfData.Length))}");
 
@@ -128,7 +136,9 @@ namespace LocalPDF_Studio_api.BLL.Services
                 file_path = request.FilePath,
                 pages = request.Options.Pages,
                 page_ranges = request.Options.PageRanges,
-                mode = request.Options.Mode
+                mode = request.Options.Mode,
+                // Image and PDF bytes come back raw in a framed result instead of base64 in JSON
+                result_channel = "framed"
             };
 
             var jsonRequest = JsonSerializer.Serialize(pythonRequest);
@@ -151,14 +161,8 @@ namespace LocalPDF_Studio_api.BLL.Services
                 };
 
                 using var process = new Process { StartInfo = startInfo };
-                var outputBuilder = new System.Text.StringBuilder();
                 var errorBuilder = new System.Text.StringBuilder();
 
-                process.OutputDataReceived += (_, e) =>
-                {
-                    if (!string.IsNullOrEmpty(e.Data))
-                        outputBuilder.AppendLine(e.Data);
-                };
                 process.ErrorDataReceived += (_, e) =>
                 {
                     if (!string.IsNullOrEmpty(e.Data))
@@ -167,13 +171,39 @@ namespace LocalPDF_Studio_api.BLL.Services
 
                 _logger.LogInformation($"Starting Python process: {startInfo.FileName} {startInfo.Arguments}");
                 process.Start();
-                process.BeginOutputReadLine();
                 process.BeginErrorReadLine();
+
+                // stdout is binary: a framed result, or plain JSON for errors
+                // reported before the framed channel was opened
+                var stdoutStream = process.StandardOutput.BaseStream;
+                var prefix = new byte[FrameMagic.Length];
+                var prefixLength = await stdoutStream.ReadAtLeastAsync(prefix, prefix.Length, throwOnEndOfStream: false);
+                PythonImageResult? framedResult = null;
+                string stdout = string.Empty;
+                if (prefixLength == prefix.Length && prefix.AsSpan().SequenceEqual(FrameMagic))
+                {
+                    framedResult = await ReadFramedResultAsync(stdoutStream);
+                    // Drain anything after the frame so the process can exit
+                    await stdoutStream.CopyToAsync(Stream.Null);
+                }
+                else
+                {
+                    using var rest = new MemoryStream();
+                    rest.Write(prefix, 0, prefixLength);
+                    await stdoutStream.CopyToAsync(rest);
+                    stdout = Encoding.UTF8.GetString(rest.ToArray()).Trim();
+                }
                 await process.WaitForExitAsync();
 
-                var stdout = outputBuilder.ToString().Trim();
                 var stderr = errorBuilder.ToString().Trim();
 
+                if (framedResult != null)
+                {
+                    if (!string.IsNullOrEmpty(stderr))
+                        _logger.LogWarning($"Python stderr: {stderr}");
+                    return framedResult;
+                }
+
                 _logger.LogDebug($"Python stdout: {stdout}");
                 if (!string.IsNullOrEmpty(stderr))
                     _logger.LogWarning($"Python stderr: {stderr}");
@@ -217,6 +247,63 @@ namespace LocalPDF_Studio_api.BLL.Services
             }
         }
 
+        // Framed result written by scripts/pdf_common/frames.py:
+        // "LPDF", version byte, big-endian header length, UTF-8 JSON header
+        // {"result": ..., "segments": [length, ...]}, then the raw segments.
+        // Inside "result" every bytes value is {"$segment": n}.
+        private static readonly byte[] FrameMagic = Encoding.ASCII.GetBytes("LPDF");
+        private const byte FrameVersion = 1;
+
+        private static async Task<PythonImageResult> ReadFramedResultAsync(Stream stream)
+        {
+            // The magic has already been read
+            var prefix = new byte[5];
+            await stream.ReadExactlyAsync(prefix);
+            if (prefix[0] != FrameVersion)
+                throw new Exception($"Unsupported frame version {prefix[0]}");
+            var headerLength = System.Buffers.Binary.BinaryPrimitives.ReadUInt32BigEndian(prefix.AsSpan(1));
+
+            var headerBytes = new byte[headerLength];
+            await stream.ReadExactlyAsync(headerBytes);
+            var header = JsonNode.Parse(headerBytes) as JsonObject
+                ?? throw new Exception("Invalid frame header");
+
+            var segments = new List<byte[]>();
+            foreach (var length in header["segments"]?.AsArray() ?? new JsonArray())
+            {
+                var segment = new byte[length!.GetValue<int>()];
+                await stream.ReadExactlyAsync(segment);
+                segments.Add(segment);
+            }
+
+            var resultNode = header["result"] as JsonObject
+                ?? throw new Exception("Frame holds no result");
+            // Bytes values are taken out before deserializing, the rest maps onto the JSON model
+            var pdfBytes = TakeSegment(resultNode, "pdf_data", segments);
+            var imageBytes = new List<byte[]?>();
+            if (resultNode["images"] is JsonArray imageNodes)
+                foreach (var imageNode in imageNodes)
+                    imageBytes.Add(TakeSegment(imageNode as JsonObject, "data", segments));
+
+            var result = resultNode.Deserialize<PythonImageResult>(new JsonSerializerOptions
+            {
+                PropertyNameCaseInsensitive = true
+            }) ?? throw new Exception("Failed to parse framed result from Python");
+
+            result.PdfBytes = pdfBytes;
+            for (var i = 0; i < result.Images.Count && i < imageBytes.Count; i++)
+                result.Images[i].Bytes = imageBytes[i];
+            return result;
+        }
+
+        private static byte[]? TakeSegment(JsonObject? node, string key, List<byte[]> segments)
+        {
+            if (node?[key] is not JsonObject reference || reference["$segment"] is not JsonValue index)
+                return null;
+            node.Remove(key);
+            return segments[index.GetValue<int>()];
+        }
+
         private byte[] CreateZipFromImages(List<PythonImage> images)
         {
             using var memoryStream = new System.IO.MemoryStream();
@@ -224,7 +311,7 @@ namespace LocalPDF_Studio_api.BLL.Services
             {
                 foreach (var image in images)
                 {
-                    var imageData = Convert.FromBase64String(image.Data);
+                    var imageData = image.Bytes ?? Convert.FromBase64String(image.Data);
                     var extension = image.Format.ToLower() == "jpg" ? "jpg" : "png";
                     var fileName = $"page_{image.Page}_image_{image.Index:D4}.{extension}";
 
@@ -39,5 +39,9 @@ namespace LocalPDF_Studio_api.DAL.Models.PdfExtractImages
 
         [JsonPropertyName("data")]
         public string Data { get; set; }
+
+        // Raw image bytes when the result came framed instead of base64
+        [JsonIgnore]
+        public byte[]? Bytes { get; set; }
     }
 }
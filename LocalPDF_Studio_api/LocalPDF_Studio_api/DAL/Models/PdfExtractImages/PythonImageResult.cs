@@ -40,6 +40,10 @@ namespace LocalPDF_Studio_api.DAL.Models.PdfExtractImages
         [JsonPropertyName("pdf_data")] // This matches the Python JSON key
         public string PdfData { get; set; }
 
+        // Raw PDF bytes when the result came framed instead of base64
+        [JsonIgnore]
+        public byte[]? PdfBytes { get; set; }
+
         [JsonPropertyName("removed_images_count")]
         public int RemovedImagesCount { get; set; }
     }
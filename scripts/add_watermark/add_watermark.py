@@ -17,122 +17,49 @@
 
 
 import argparse
-import fitz  # PyMuPDF
 import os
 import sys
 import json
-from PIL import Image, ImageDraw, ImageFont
-import tempfile
 import io
+import hashlib
+import shutil
+
+PIECE_INFO_APP = "LocalPDFStudio"       # our entry in the pages' /PieceInfo
+WATERMARK_TAG = b"/Artifact <</Type /Pagination /Subtype /Watermark>> BDC"  # marked-content tag of a stamp
+CHECKPOINT_PAGES = 50                   # pages stamped between incremental saves
+IMAGE_WATERMARK_DPI = 300               # resolution image watermarks are prepared at
+TILE_SPACING = 36                       # gap between tiled stamps, in points
+TILE_STAGGER = 0.5                      # row shift as a fraction of the column step
 
 def add_text_watermark(input_path, output_path, text, position, rotation, opacity, 
                       font_size, text_color, start_page, end_page, pages_range, custom_pages,
                       watermark_type="text", image_path=None, image_scale=50):
-    try:
-        if not os.path.exists(input_path):
-            return {"success": False, "error": f"Input file not found: {input_path}"}
-
-        if watermark_type == "image":
-            if not image_path or not os.path.exists(image_path):
-                return {"success": False, "error": f"Image file not found: {image_path}"}
-            return add_image_watermark(input_path, output_path, image_path, position, rotation, 
-                                     opacity, image_scale, start_page, end_page, pages_range, custom_pages)
-        else:
-            # Original text watermark code
-            doc = fitz.open(input_path)
-            total_pages = doc.page_count
-            
-            # Parse page range
-            target_pages = parse_page_range(total_pages, start_page, end_page, pages_range, custom_pages)
-            
-            for page_num in target_pages:
-                if page_num < 1 or page_num > total_pages:
-                    continue
-                    
-                page = doc[page_num - 1]
-                
-                if position == "Tiled":
-                    add_tiled_watermark_high_quality(page, text, font_size, text_color, opacity, rotation)
-                else:
-                    add_single_watermark_high_quality(page, text, position, font_size, text_color, opacity, rotation)
-
-            doc.save(output_path)
-            doc.close()
-            
-            return {
-                "success": True,
-                "page_count": total_pages,
-                "watermarked_pages": len(target_pages),
-                "output": output_path
-            }
-
-    except Exception as e:
-        return {"success": False, "error": str(e)}
-
-def add_single_watermark_high_quality(page, text, position, font_size, text_color, opacity, rotation):
-    """Add high-quality image watermark"""
-    # Create high-quality image
-    watermark_image = create_high_quality_watermark_image(text, font_size, text_color, opacity, rotation)
-    
-    # Convert to bytes
-    img_bytes = io.BytesIO()
-    watermark_image.save(img_bytes, format='PNG', dpi=(300, 300))
-    img_bytes.seek(0)
-    
-    # Create pixmap
-    pix = fitz.Pixmap(img_bytes.read())
-    
-    # Convert pixel dimensions to points
-    dpi = 300
-    width_in_points = pix.width * 72 / dpi
-    height_in_points = pix.height * 72 / dpi
-    
-    # Calculate position (using dimensions in points)
-    rect = calculate_simple_position(page.rect, position, width_in_points, height_in_points)
-    
-    # Insert image
-    page.insert_image(rect, pixmap=pix)
-    pix = None
+    return add_watermark(input_path, output_path, watermark_type=watermark_type, text=text,
+                         image_path=image_path, position=position, rotation=rotation, opacity=opacity,
+                         font_size=font_size, text_color=text_color, image_scale=image_scale,
+                         start_page=start_page, end_page=end_page, pages_range=pages_range,
+                         custom_pages=custom_pages)
 
-def add_tiled_watermark_high_quality(page, text, font_size, text_color, opacity, rotation):
-    """Add three high-quality watermarks"""
-    page_rect = page.rect
-    page_width = page_rect.width
-    page_height = page_rect.height
-    
+def prepare_text_watermark(text, font_size, text_color, opacity, rotation):
+    """Render the text watermark once per job; same result shape as prepare_image_watermark"""
     # Create high-quality image
     watermark_image = create_high_quality_watermark_image(text, font_size, text_color, opacity, rotation)
     
     # Convert to bytes
     img_bytes = io.BytesIO()
     watermark_image.save(img_bytes, format='PNG', dpi=(300, 300))
-    img_bytes.seek(0)
-    pix = fitz.Pixmap(img_bytes.read())
     
     # Convert pixel dimensions to points
     dpi = 300
-    watermark_width = pix.width * 72 / dpi
-    watermark_height = pix.height * 72 / dpi
-    
-    # Position three watermarks: center, top-center, bottom-center
-    center_x = page_width / 2
-    center_y = page_height / 2
-    
-    positions = [
-        (center_x - watermark_width / 2, center_y - watermark_height / 2),  # Center
-        (center_x - watermark_width / 2, center_y / 3 - watermark_height / 2),  # Top-third
-        (center_x - watermark_width / 2, center_y * 5/3 - watermark_height / 2)  # Bottom-third
-    ]
+    width_in_points = watermark_image.width * 72 / dpi
+    height_in_points = watermark_image.height * 72 / dpi
     
-    # Add the three watermarks
-    for x, y in positions:
-        rect = fitz.Rect(x, y, x + watermark_width, y + watermark_height)
-        page.insert_image(rect, pixmap=pix)
-    
-    pix = None  # Free memory
+    return {"data": img_bytes.getvalue(), "width": width_in_points, "height": height_in_points}
 
 def create_high_quality_watermark_image(text, font_size, text_color, opacity, rotation):
     """Create high-quality watermark image with proper DPI"""
+    from PIL import Image, ImageDraw, ImageFont
+
     # Use high DPI for crisp rendering
     dpi = 300
     scale_factor = dpi / 72.0  # PDF points to pixels
@@ -227,6 +154,8 @@ def create_high_quality_watermark_image(text, font_size, text_color, opacity, ro
 
 def calculate_simple_position(page_rect, position, img_width, img_height):
     """Simple positioning without complex scaling"""
+    import fitz  # PyMuPDF
+
     page_width = page_rect.width
     page_height = page_rect.height
     
@@ -259,6 +188,76 @@ def calculate_simple_position(page_rect, position, img_width, img_height):
     
     return fitz.Rect(x, y, x + img_width, y + img_height)
 
+def watermark_job_key(watermark_type, text, image_path, position, rotation, opacity, font_size, text_color,
+                      image_scale, tiling=None):
+    """Short fingerprint of the watermark settings (and image content), used to mark stamped pages"""
+    if watermark_type == "image":
+        settings = [watermark_type, position, rotation, opacity, image_scale]
+    else:
+        settings = [watermark_type, text, position, rotation, opacity, font_size, text_color]
+    if tiling:
+        settings.append(list(tiling))
+    digest = hashlib.sha1(json.dumps(settings).encode("utf-8"))
+    if watermark_type == "image":
+        with open(image_path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+def stamp_marker(job_key):
+    """Key under the page's /PieceInfo (the PDF's slot for application data) recording the stamp"""
+    return f"PieceInfo/{PIECE_INFO_APP}/Private/W{job_key}"
+
+def stamped_pages(doc, job_key):
+    """0-based numbers of the pages already carrying this watermark"""
+    marker = stamp_marker(job_key)
+    return {i for i in range(doc.page_count) if doc.xref_get_key(doc.page_xref(i), marker)[0] != "null"}
+
+def mark_stamped(doc, page, job_key):
+    import fitz  # PyMuPDF
+
+    doc.xref_set_key(page.xref, f"PieceInfo/{PIECE_INFO_APP}/LastModified", fitz.get_pdf_str(fitz.get_pdf_now()))
+    doc.xref_set_key(page.xref, stamp_marker(job_key), "true")
+
+SOURCE_MARKER = f"PieceInfo/{PIECE_INFO_APP}/Private/Source"  # in the catalog: input the output was made from
+
+def input_fingerprint(input_path):
+    """
+    Hash of the input file's identity (path, modification time, size) as
+    stored in the output; the path itself never ends up in the file
+    """
+    stat = os.stat(input_path)
+    identity = json.dumps([os.path.realpath(input_path), stat.st_mtime_ns, stat.st_size])
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+def mark_source(doc, input_path):
+    import fitz  # PyMuPDF
+
+    doc.xref_set_key(doc.pdf_catalog(), SOURCE_MARKER, fitz.get_pdf_str(input_fingerprint(input_path)))
+
+def same_file(path_a, path_b):
+    try:
+        return os.path.samefile(path_a, path_b)
+    except OSError:
+        return False
+
+def can_resume(input_path, output_path, job_key):
+    """
+    True when output_path is a partial result of this job: a valid PDF made
+    from this very input (unchanged since) with pages stamped by this job
+    """
+    if not os.path.exists(output_path) or same_file(input_path, output_path):
+        return False
+    import fitz  # PyMuPDF
+
+    try:
+        with fitz.open(output_path) as output, fitz.open(input_path) as source:
+            kind, source_mark = output.xref_get_key(output.pdf_catalog(), SOURCE_MARKER)
+            return (kind == "string" and source_mark == input_fingerprint(input_path)
+                    and output.page_count == source.page_count and bool(output.can_save_incrementally())
+                    and bool(stamped_pages(output, job_key)))
+    except Exception:
+        return False
+
 def parse_page_range(total_pages, start_page, end_page, pages_range, custom_pages):
     """Parse which pages to apply watermark to"""
     if pages_range == "all":
@@ -306,7 +305,9 @@ def parse_custom_pages(custom_pages, total_pages):
 def add_watermark(input_path, output_path, watermark_type="text", text="CONFIDENTIAL", 
                  image_path=None, position="Center", rotation=45, opacity=60, 
                  font_size=36, text_color="#3498db", image_scale=50,
-                 start_page=1, end_page=0, pages_range="all", custom_pages=""):
+                 start_page=1, end_page=0, pages_range="all", custom_pages="",
+                 tile_spacing=TILE_SPACING, tile_stagger=TILE_STAGGER):
+    temp_path = None
     try:
         # Normalize paths for cross-platform compatibility
         input_path = os.path.normpath(input_path)
@@ -320,172 +321,279 @@ def add_watermark(input_path, output_path, watermark_type="text", text="CONFIDEN
         if watermark_type == "image" and (not image_path or not os.path.exists(image_path)):
             return {"success": False, "error": f"Image file not found: {image_path}"}
 
-        doc = fitz.open(input_path)
-        total_pages = doc.page_count
-        
-        # Parse page range
-        target_pages = parse_page_range(total_pages, start_page, end_page, pages_range, custom_pages)
-        
-        for page_num in target_pages:
-            if page_num < 1 or page_num > total_pages:
-                continue
-                
-            page = doc[page_num - 1]
+        if tile_spacing < 0:
+            return {"success": False, "error": f"Tile spacing must not be negative: {tile_spacing}"}
+
+        # Pages stamped with a watermark are marked with its job key, so pages
+        # stamped by an earlier or interrupted run of the same job are
+        # skipped and only the changes are appended.
+        job_key = watermark_job_key(
+            watermark_type, text, image_path, position, rotation, opacity, font_size, text_color, image_scale,
+            tiling=(tile_spacing, tile_stagger) if position == "Tiled" else None)
+        resumed = can_resume(input_path, output_path, job_key)
+        in_place = same_file(input_path, output_path)
+        if not resumed and not in_place:
+            shutil.copyfile(input_path, output_path)
+
+        # Heavy imports are deferred until the input has been validated
+        import fitz  # PyMuPDF
+
+        # Opened from its path (not through the document cache) so it can be saved incrementally
+        doc = fitz.open(output_path)
+        try:
+            total_pages = doc.page_count
+            if not resumed and not in_place:
+                # Saved with the first checkpoint, so a retry knows which input this came from
+                mark_source(doc, input_path)
+            already_stamped = stamped_pages(doc, job_key)
+            incremental = doc.can_save_incrementally()
             
-            if watermark_type == "image":
-                if position == "Tiled":
-                    add_tiled_image_watermark(page, image_path, image_scale, opacity, rotation)
+            # Parse page range
+            target_pages = parse_page_range(total_pages, start_page, end_page, pages_range, custom_pages)
+
+            pending = [page_num for page_num in target_pages
+                       if 1 <= page_num <= total_pages and page_num - 1 not in already_stamped]
+
+            # The watermark is prepared once per job and laid out once per page geometry
+            layouts = None
+            if pending:
+                if watermark_type == "image":
+                    watermark = prepare_image_watermark(image_path, image_scale, opacity, rotation)
+                    layouts = LayoutCache(watermark, position, image_scale, tile_spacing, tile_stagger)
                 else:
-                    add_single_image_watermark(page, image_path, position, image_scale, opacity, rotation)
+                    watermark = prepare_text_watermark(text, font_size, text_color, opacity, rotation)
+                    layouts = LayoutCache(watermark, position, font_size, tile_spacing, tile_stagger)
+                for page_num in pending:
+                    layouts.prepare(doc[page_num - 1])
+            
+            stamped = 0
+            skipped = 0
+            for page_num in target_pages:
+                if page_num < 1 or page_num > total_pages:
+                    continue
+                if page_num - 1 in already_stamped:
+                    skipped += 1
+                    continue
+                    
+                page = doc[page_num - 1]
+                
+                try:
+                    layouts.place(page)
+                except Exception as e:
+                    raise Exception(f"Failed to add watermark to page {page_num}: {str(e)}")
+
+                mark_stamped(doc, page, job_key)
+                page = None
+
+                stamped += 1
+                if incremental and stamped % CHECKPOINT_PAGES == 0:
+                    # A crash after this point leaves a valid file a retry can resume from.
+                    # Reopen afterwards: a second saveIncr() on the same handle writes a broken xref.
+                    doc.saveIncr()
+                    shown_pages = doc.ShownPages
+                    doc.close()
+                    doc = fitz.open(output_path)
+                    # Keep reusing the tile XObjects already written to the file
+                    doc.ShownPages.update(shown_pages)
+
+            if incremental:
+                if doc.is_dirty:
+                    doc.saveIncr()
             else:
-                if position == "Tiled":
-                    add_tiled_watermark_high_quality(page, text, font_size, text_color, opacity, rotation)
-                else:
-                    add_single_watermark_high_quality(page, text, position, font_size, text_color, opacity, rotation)
+                # Repaired or encrypted files can't be updated in place. Save under a
+                # unique name beside the output (same filesystem, so os.replace is atomic)
+                import tempfile
 
-        doc.save(output_path)
-        doc.close()
+                fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(output_path) + ".", suffix=".tmp",
+                                                 dir=os.path.dirname(os.path.abspath(output_path)))
+                os.close(fd)
+                doc.save(temp_path)
+        finally:
+            doc.close()
+            if layouts:
+                layouts.close()
+        if not incremental:
+            os.replace(temp_path, output_path)
+            temp_path = None
         
         return {
             "success": True,
             "page_count": total_pages,
-            "watermarked_pages": len(target_pages),
+            "watermarked_pages": stamped,
+            "skipped_pages": skipped,
+            "resumed": resumed,
+            "layout_cache": layouts.stats() if layouts else {"layouts": 0, "hits": 0, "misses": 0},
             "output": output_path
         }
 
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+    finally:
+        # A save that failed or never got moved into place leaves nothing behind
+        if temp_path and os.path.exists(temp_path):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
 def add_image_watermark(input_path, output_path, image_path, position, rotation, opacity, 
                        image_scale, start_page, end_page, pages_range, custom_pages):
-    try:
-        if not os.path.exists(input_path):
-            return {"success": False, "error": f"Input file not found: {input_path}"}
-        if not os.path.exists(image_path):
-            return {"success": False, "error": f"Image file not found: {image_path}"}
+    return add_watermark(input_path, output_path, watermark_type="image", image_path=image_path,
+                         position=position, rotation=rotation, opacity=opacity, image_scale=image_scale,
+                         start_page=start_page, end_page=end_page, pages_range=pages_range,
+                         custom_pages=custom_pages)
 
-        doc = fitz.open(input_path)
-        total_pages = doc.page_count
-        
-        # Parse page range
-        target_pages = parse_page_range(total_pages, start_page, end_page, pages_range, custom_pages)
-        
-        for page_num in target_pages:
-            if page_num < 1 or page_num > total_pages:
-                continue
-                
-            page = doc[page_num - 1]
-            
-            if position == "Tiled":
-                add_tiled_image_watermark(page, image_path, image_scale, opacity, rotation)
-            else:
-                add_single_image_watermark(page, image_path, position, image_scale, opacity, rotation)
-
-        doc.save(output_path)
-        doc.close()
-        
-        return {
-            "success": True,
-            "page_count": total_pages,
-            "watermarked_pages": len(target_pages),
-            "output": output_path
-        }
+def prepare_image_watermark(image_path, image_scale, opacity, rotation, dpi=IMAGE_WATERMARK_DPI):
+    """
+    Load, fade and rotate the watermark image once per job.
 
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    The placed size (in points) is what the full-resolution image would get
+    at image_scale, but the source is first downscaled to the pixels that
+    size needs at dpi, so large logos shown small stay cheap. Opacity is
+    applied through a lookup table on the alpha channel. Returns a dict with
+    the PNG data and the placed width/height in points.
+    """
+    import math
+    from PIL import Image
 
-def add_single_image_watermark(page, image_path, position, image_scale, opacity, rotation):
-    """Add single image watermark"""
     try:
-        # Load and process the image
-        with Image.open(image_path) as img:
-            # Convert to RGBA if needed
-            if img.mode != 'RGBA':
-                img = img.convert('RGBA')
-            
-            # Apply opacity
-            if opacity < 100:
-                alpha = img.split()[3] if len(img.split()) > 3 else Image.new('L', img.size, 255)
-                alpha = alpha.point(lambda p: p * opacity // 100)
-                img.putalpha(alpha)
-            
-            # Apply rotation
-            if rotation != 0:
-                img = img.rotate(-rotation, expand=True, resample=Image.BICUBIC, fillcolor=(0, 0, 0, 0))
-            
-            # Convert to bytes
-            img_bytes = io.BytesIO()
-            img.save(img_bytes, format='PNG')
-            img_bytes.seek(0)
-            
-            # Create pixmap
-            pix = fitz.Pixmap(img_bytes.read())
-            
-            # Calculate scale factor (image_scale is percentage)
-            scale_factor = image_scale / 100.0
-            watermark_width = pix.width * scale_factor
-            watermark_height = pix.height * scale_factor
-            
-            # Calculate position
-            rect = calculate_simple_position(page.rect, position, watermark_width, watermark_height)
-            
-            # Insert image
-            page.insert_image(rect, pixmap=pix)
-            pix = None
-    except Exception as e:
-        raise Exception(f"Failed to add image watermark: {str(e)}")
+        with Image.open(image_path) as source:
+            img = source.convert('RGBA')
 
-def add_tiled_image_watermark(page, image_path, image_scale, opacity, rotation):
-    """Add three tiled image watermarks"""
-    try:
-        page_rect = page.rect
-        page_width = page_rect.width
-        page_height = page_rect.height
-        
-        # Load and process the image
-        with Image.open(image_path) as img:
-            if img.mode != 'RGBA':
-                img = img.convert('RGBA')
-            
-            # Apply opacity
-            if opacity < 100:
-                alpha = img.split()[3] if len(img.split()) > 3 else Image.new('L', img.size, 255)
-                alpha = alpha.point(lambda p: p * opacity // 100)
-                img.putalpha(alpha)
-            
-            # Apply rotation
-            if rotation != 0:
-                img = img.rotate(-rotation, expand=True, resample=Image.BICUBIC, fillcolor=(0, 0, 0, 0))
-            
-            # Convert to bytes
-            img_bytes = io.BytesIO()
-            img.save(img_bytes, format='PNG')
-            img_bytes.seek(0)
-            pix = fitz.Pixmap(img_bytes.read())
-        
-        # Calculate scale factor
         scale_factor = image_scale / 100.0
-        watermark_width = pix.width * scale_factor
-        watermark_height = pix.height * scale_factor
-        
-        # Position three watermarks
-        center_x = page_width / 2
-        center_y = page_height / 2
-        
-        positions = [
-            (center_x - watermark_width / 2, center_y - watermark_height / 2),  # Center
-            (center_x - watermark_width / 2, center_y / 3 - watermark_height / 2),  # Top-third
-            (center_x - watermark_width / 2, center_y * 5/3 - watermark_height / 2)  # Bottom-third
-        ]
-        
-        # Add the three watermarks
-        for x, y in positions:
-            rect = fitz.Rect(x, y, x + watermark_width, y + watermark_height)
-            page.insert_image(rect, pixmap=pix)
-        
-        pix = None
+
+        # Bounding box of the rotated full-size image, i.e. the placed size
+        angle = math.radians(rotation)
+        cos_a, sin_a = abs(math.cos(angle)), abs(math.sin(angle))
+        width = (img.width * cos_a + img.height * sin_a) * scale_factor
+        height = (img.width * sin_a + img.height * cos_a) * scale_factor
+
+        # Pixels needed to show the image at dpi in its placed size
+        resample = scale_factor * dpi / 72.0
+        if resample < 1:
+            target = (max(1, round(img.width * resample)), max(1, round(img.height * resample)))
+            img = img.resize(target, Image.LANCZOS)
+
+        # Apply opacity
+        if opacity < 100:
+            lut = [value * opacity // 100 for value in range(256)]
+            img.putalpha(img.getchannel('A').point(lut))
+
+        # Apply rotation
+        if rotation != 0:
+            img = img.rotate(-rotation, expand=True, resample=Image.BICUBIC, fillcolor=(0, 0, 0, 0))
+
+        img_bytes = io.BytesIO()
+        img.save(img_bytes, format='PNG')
     except Exception as e:
-        raise Exception(f"Failed to add tiled image watermark: {str(e)}")
+        raise Exception(f"Failed to prepare image watermark: {str(e)}")
+
+    return {"data": img_bytes.getvalue(), "width": width, "height": height}
+
+def tile_layout(page_width, page_height, tile_width, tile_height, spacing=TILE_SPACING, stagger=TILE_STAGGER):
+    """
+    (x0, y0, x1, y1) of every stamp in a grid covering the whole page.
+
+    Stamps are spacing points apart; each row is shifted right by stagger
+    times the column step, which turns the columns into diagonals.
+    """
+    step_x = tile_width + spacing
+    step_y = tile_height + spacing
+    rects = []
+    row = 0
+    y = -tile_height / 2
+    while y < page_height:
+        x = (row * stagger % 1) * step_x - step_x
+        while x < page_width:
+            if x + tile_width > 0:
+                rects.append((x, y, x + tile_width, y + tile_height))
+            x += step_x
+        y += step_y
+        row += 1
+    return rects
+
+def stamp_rects(page_width, page_height, watermark, position, spacing=TILE_SPACING, stagger=TILE_STAGGER):
+    """Where the watermark goes on a page of this size: the full grid for "Tiled", else one rect"""
+    import fitz  # PyMuPDF
+
+    if position == "Tiled":
+        return tile_layout(page_width, page_height, watermark["width"], watermark["height"], spacing, stagger)
+    rect = calculate_simple_position(fitz.Rect(0, 0, page_width, page_height), position,
+                                     watermark["width"], watermark["height"])
+    return [tuple(rect)]
+
+class LayoutCache:
+    """
+    Watermark placement per distinct page geometry.
+
+    Entries are keyed by (width, height, rotation, position, scale). Each
+    holds the computed stamp rects, drawn on a template page of a scratch
+    document that references the prepared image once. Every page of that
+    geometry shows the same template, so its stamps become one shared
+    XObject and the per-page work is a single reference.
+
+    Templates for all geometries must exist before the first page is
+    stamped (MuPDF cannot graft from a document that grew after it was
+    first shown on a page), hence prepare() before place().
+    """
+
+    def __init__(self, watermark, position, scale, spacing=TILE_SPACING, stagger=TILE_STAGGER):
+        import fitz  # PyMuPDF
+
+        self.watermark = watermark
+        self.position = position
+        self.scale = scale
+        self.spacing = spacing
+        self.stagger = stagger
+        self.templates = fitz.open()
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}  # key -> (template page number, rects)
+        self._image_xref = 0
+
+    def key(self, page):
+        return (round(page.rect.width, 2), round(page.rect.height, 2), page.rotation, self.position, self.scale)
+
+    def prepare(self, page):
+        """Look up the page's geometry, laying out a new template on a miss"""
+        import fitz  # PyMuPDF
+
+        key = self.key(page)
+        if key in self._entries:
+            self.hits += 1
+            return
+        self.misses += 1
+        width, height = key[0], key[1]
+        rects = stamp_rects(width, height, self.watermark, self.position, self.spacing, self.stagger)
+        template = self.templates.new_page(width=width, height=height)
+        for rect in rects:
+            # The image is stored once and referenced by every stamp
+            if self._image_xref:
+                template.insert_image(fitz.Rect(rect), xref=self._image_xref)
+            else:
+                self._image_xref = template.insert_image(fitz.Rect(rect), stream=self.watermark["data"])
+        self._entries[key] = (template.number, rects)
+
+    def place(self, page):
+        """
+        Show the page's template on it, tagged as a watermark artifact: part
+        of the page for every viewer (unlike an optional content layer,
+        which can be switched off) but skipped by text extraction and
+        screen readers
+        """
+        pno, _ = self._entries[self.key(page)]
+        # show_pdf_page ignores /Rotate, so place the template in unrotated space
+        page.show_pdf_page(page.rect * page.derotation_matrix, self.templates, pno, rotate=page.rotation)
+        # The stamp is drawn by the content stream show_pdf_page appended last
+        xref = page.get_contents()[-1]
+        page.parent.update_stream(xref, WATERMARK_TAG + page.parent.xref_stream(xref) + b"EMC\n")
+
+    def stats(self):
+        return {"layouts": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        self.templates.close()
 
 def main():
     parser = argparse.ArgumentParser(description="Add watermark to PDF pages")
@@ -511,6 +619,10 @@ def main():
                        help="Watermark position")
     parser.add_argument("--rotation", type=int, default=45, help="Rotation angle in degrees")
     parser.add_argument("--opacity", type=int, default=60, help="Opacity percentage (1-100)")
+    parser.add_argument("--tile-spacing", type=float, default=TILE_SPACING,
+                       help="Tiled position: gap between stamps in points")
+    parser.add_argument("--tile-stagger", type=float, default=TILE_STAGGER,
+                       help="Tiled position: row shift as a fraction of the column step (0 = straight grid)")
     
     # Page range options
     parser.add_argument("--start-page", type=int, default=1, help="Start page (1-based)")
@@ -538,7 +650,9 @@ def main():
         start_page=args.start_page,
         end_page=args.end_page,
         pages_range=args.pages_range,
-        custom_pages=args.custom_pages
+        custom_pages=args.custom_pages,
+        tile_spacing=args.tile_spacing,
+        tile_stagger=args.tile_stagger
     )
 
     if args.json:
@@ -0,0 +1,215 @@
+##
+ # LocalPDF Studio - Offline PDF Toolkit
+ # ======================================
+ #
+ # @author      Md. Alinur Hossain <alinur1160@gmail.com>
+ # @license     AGPL 3.0 (GNU Affero General Public License version 3)
+ # @website     https://alinur1.github.io/LocalPDF_Studio_Website/
+ # @repository  https://github.com/Alinur1/LocalPDF_Studio
+ #
+ # Copyright (c) 2025 Md. Alinur Hossain. All rights reserved.
+ #
+ # Architecture:
+ # - Frontend: Electron + HTML/CSS/JS
+ # - Backend: ASP.NET Core Web API, Python
+ # - PDF Engine: PdfSharp + Mozilla PDF.js
+##
+
+
+import io
+import os
+import random
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+
+LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam, "
+    "quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat."
+)
+
+
+def make_photo_bytes(rng, width, height, fmt="JPEG"):
+    """Create a noisy photo-like image so encoders have real work to do"""
+    # Coarse random blocks upscaled with bicubic give smooth gradients,
+    # a little per-pixel noise on top keeps the image from compressing away.
+    coarse = Image.frombytes("RGB", (8, 8), rng.randbytes(8 * 8 * 3))
+    img = coarse.resize((width, height), Image.BICUBIC)
+    noise = Image.frombytes("L", (width, height), rng.randbytes(width * height))
+    img = Image.blend(img, Image.merge("RGB", (noise, noise, noise)), 0.15)
+
+    buffer = io.BytesIO()
+    if fmt == "JPEG":
+        img.save(buffer, format="JPEG", quality=85)
+    else:
+        img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def make_text_heavy(path, pages=50, seed=1):
+    """Pages of dense body text, the common office document case"""
+    rng = random.Random(seed)
+    words = LOREM.split()
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page(width=595, height=842)  # A4
+        y = 50
+        while y < 800:
+            line = " ".join(rng.choice(words) for _ in range(14))
+            page.insert_text((50, y), line, fontsize=10)
+            y += 13
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def make_image_heavy(path, pages=20, shared=True, images_per_page=4, seed=2):
+    """
+    Pages dominated by photos.
+
+    With shared=True every page references the same image xref (logos,
+    letterheads); otherwise each placement is a distinct image (photo books).
+    """
+    rng = random.Random(seed)
+    doc = fitz.open()
+    shared_xref = 0
+    shared_bytes = make_photo_bytes(rng, 800, 600) if shared else None
+
+    for _ in range(pages):
+        page = doc.new_page(width=612, height=792)  # Letter
+        for i in range(images_per_page):
+            col, row = i % 2, i // 2
+            rect = fitz.Rect(36 + col * 276, 36 + row * 210, 36 + col * 276 + 264, 36 + row * 210 + 198)
+            if shared:
+                if shared_xref:
+                    page.insert_image(rect, xref=shared_xref)
+                else:
+                    shared_xref = page.insert_image(rect, stream=shared_bytes)
+            else:
+                page.insert_image(rect, stream=make_photo_bytes(rng, 640, 480))
+        page.insert_text((36, 760), LOREM[:90], fontsize=9)
+
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def make_huge_page(path, width=2384, height=3370, seed=3):
+    """One A0-sized drawing sheet with vector line work, text and a photo"""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    page = doc.new_page(width=width, height=height)
+
+    shape = page.new_shape()
+    for _ in range(2000):
+        x0, y0 = rng.uniform(0, width), rng.uniform(0, height)
+        shape.draw_line((x0, y0), (x0 + rng.uniform(-200, 200), y0 + rng.uniform(-200, 200)))
+    shape.finish(color=(0, 0, 0), width=0.5)
+    shape.commit()
+
+    for y in range(100, height - 100, 120):
+        page.insert_text((100, y), LOREM, fontsize=18)
+
+    page.insert_image(fitz.Rect(width / 2, height / 2, width - 100, height - 100),
+                      stream=make_photo_bytes(rng, 1600, 1600))
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def make_tiny_pages(path, pages=2000, seed=4):
+    """Thousands of label-sized pages, stressing per-page overhead"""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page(width=144, height=72)
+        page.insert_text((8, 30), f"Label {i + 1:05d}", fontsize=12)
+        page.insert_text((8, 50), f"SKU {rng.randrange(10 ** 8):08d}", fontsize=8)
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def make_scanned(path, pages=20, seed=6):
+    """Scanned office pages: one full-page grayscale JPEG of text per page, 150 DPI A4"""
+    from PIL import ImageDraw
+
+    rng = random.Random(seed)
+    words = LOREM.split()
+    doc = fitz.open()
+    for _ in range(pages):
+        img = Image.new("L", (1240, 1754), 235)
+        draw = ImageDraw.Draw(img)
+        for y in range(100, 1650, 26):
+            draw.text((100, y), " ".join(rng.choice(words) for _ in range(16)), fill=25)
+        noise = Image.frombytes("L", img.size, rng.randbytes(img.width * img.height))
+        img = Image.blend(img, noise, 0.05)
+
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=80)
+        page = doc.new_page(width=595, height=842)
+        page.insert_image(page.rect, stream=buffer.getvalue())
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def make_gray_photo(path, pages=10, seed=7):
+    """Black-and-white photos: one full-page grayscale JPEG photo per page"""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for _ in range(pages):
+        img = Image.open(io.BytesIO(make_photo_bytes(rng, 1240, 1754))).convert("L")
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=85)
+        page = doc.new_page(width=595, height=842)
+        page.insert_image(page.rect, stream=buffer.getvalue())
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def make_logo(path, width=1200, height=600, seed=5):
+    """A large RGBA logo for the image watermark cases"""
+    rng = random.Random(seed)
+    img = Image.open(io.BytesIO(make_photo_bytes(rng, width, height, fmt="PNG"))).convert("RGBA")
+    # Transparent border so the alpha channel actually matters
+    mask = Image.new("L", (width, height), 0)
+    mask.paste(255, (width // 8, height // 8, width * 7 // 8, height * 7 // 8))
+    img.putalpha(mask)
+    img.save(path, format="PNG")
+
+
+# name -> (generator, kwargs); sizes are multiplied by the corpus scale
+CORPUS = {
+    "text_heavy": (make_text_heavy, {"pages": 50}),
+    "image_shared": (make_image_heavy, {"pages": 20, "shared": True}),
+    "image_unique": (make_image_heavy, {"pages": 20, "shared": False}),
+    "huge_page": (make_huge_page, {}),
+    "tiny_pages": (make_tiny_pages, {"pages": 2000}),
+    "scanned": (make_scanned, {"pages": 20}),
+    "gray_photo": (make_gray_photo, {"pages": 10}),
+}
+
+
+def build_corpus(corpus_dir, scale=1.0):
+    """
+    Generate every corpus document (plus the watermark logo) into
+    corpus_dir and return {name: path}.
+
+    Files that already exist are reused, so a corpus directory can be kept
+    between runs. The scale factor is part of the file name to keep
+    differently sized corpora apart.
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    paths = {}
+    for name, (generator, kwargs) in CORPUS.items():
+        kwargs = dict(kwargs)
+        if "pages" in kwargs:
+            kwargs["pages"] = max(1, int(kwargs["pages"] * scale))
+        path = os.path.join(corpus_dir, f"{name}_x{scale:g}.pdf")
+        if not os.path.exists(path):
+            generator(path, **kwargs)
+        paths[name] = path
+
+    logo_path = os.path.join(corpus_dir, "logo.png")
+    if not os.path.exists(logo_path):
+        make_logo(logo_path)
+    paths["logo"] = logo_path
+    return paths
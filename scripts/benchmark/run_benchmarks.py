@@ -0,0 +1,533 @@
+##
+ # LocalPDF Studio - Offline PDF Toolkit
+ # ======================================
+ #
+ # @author      Md. Alinur Hossain <alinur1160@gmail.com>
+ # @license     AGPL 3.0 (GNU Affero General Public License version 3)
+ # @website     https://alinur1.github.io/LocalPDF_Studio_Website/
+ # @repository  https://github.com/Alinur1/LocalPDF_Studio
+ #
+ # Copyright (c) 2025 Md. Alinur Hossain. All rights reserved.
+ #
+ # Architecture:
+ # - Frontend: Electron + HTML/CSS/JS
+ # - Backend: ASP.NET Core Web API, Python
+ # - PDF Engine: PdfSharp + Mozilla PDF.js
+##
+
+"""
+Benchmark suite for the Python PDF tools.
+
+Generates a synthetic corpus locally (see corpus.py), times the script entry
+points against it and prints the timings as JSON. Only the report goes to
+stdout, so it can be redirected to a file; progress and library messages go
+to stderr. Pass --baseline to compare with an earlier run; the process exits
+with 1 when any case got slower than --max-slowdown allows.
+
+    python run_benchmarks.py --output baseline.json
+    python run_benchmarks.py --baseline baseline.json --max-slowdown 1.25
+
+--startup adds cold-start cases (--help and validation errors run in a fresh
+interpreter) with a `-X importtime` report; --startup-budget fails the run
+when any of them takes longer than the given number of seconds.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+for _tool in ("convert_pdf_images", "add_watermark", "redact_pdf", "extract_images"):
+    sys.path.insert(0, os.path.join(SCRIPTS_DIR, _tool))
+
+from pdf_common.sinks import claim_stdout
+
+# Only the report goes to stdout: anything else written there, PyMuPDF's
+# warnings and MuPDF's messages from C included, lands on stderr
+REPORT_STREAM = claim_stdout() if __name__ == "__main__" else None
+
+import fitz  # PyMuPDF
+
+import corpus
+import startup
+from add_watermark import add_watermark
+from convert_pdf_images import convert_many, convert_pdf_to_images
+from extract_images import extract_images_from_pdf
+from redact_pdf import apply_redactions, verify_redactions
+from pdf_common.doc_loader import DocumentCache, open_pdf
+from pdf_common.frames import read_framed, write_framed
+
+
+# DPIs are limited per document so the huge page stays within a sane memory budget
+CONVERT_DPIS = {
+    "text_heavy": (72, 150, 300),
+    "image_shared": (72, 150, 300),
+    "huge_page": (72, 150),
+    "tiny_pages": (72, 150),
+}
+
+PIPELINE_WORKERS = 4
+
+
+def grid_redactions(page_count, per_page):
+    """Evenly spread per_page small boxes over every page"""
+    columns = max(1, int(per_page ** 0.5))
+    rows = -(-per_page // columns)
+    width, height = 0.8 / columns, 0.8 / rows
+    redactions = []
+    for page in range(1, page_count + 1):
+        for i in range(per_page):
+            col, row = i % columns, i // columns
+            redactions.append({
+                "page": page,
+                "x": 0.1 + col * width,
+                "y": 0.1 + row * height,
+                "width": width * 0.6,
+                "height": height * 0.6,
+                "color": "#000000",
+            })
+    return redactions
+
+
+def run_redaction(input_path, output_path, redactions, image_mode="remove", verify=False):
+    # apply_redactions reports on stdout like the CLI does; keep the JSON output clean
+    with contextlib.redirect_stdout(io.StringIO()) as captured:
+        exit_code = apply_redactions(input_path, output_path, redactions, image_mode, verify)
+    if exit_code != 0:
+        return json.loads(captured.getvalue())
+    return {"success": True, "metrics": {"output_bytes": os.path.getsize(output_path)}}
+
+
+def check_pixel_redaction(work_dir):
+    """
+    Redact boxes at fractional pixel positions from a known 0/128 checker
+    image in "pixels" mode, then decode the output image and fail if any
+    pattern value survives under a box, partly covered edge pixels included
+    """
+    import math
+
+    from PIL import Image
+
+    # 200 x 100 pixels shown at 1.5 points per pixel
+    width, height, scale, origin = 200, 100, 1.5, 50
+    pattern = Image.new("L", (width, height))
+    pattern.putdata([0 if (x + y) % 2 else 128 for y in range(height) for x in range(width)])
+    buffer = io.BytesIO()
+    pattern.save(buffer, format="PNG")
+    input_path = os.path.join(work_dir, "pattern.pdf")
+    output_path = os.path.join(work_dir, "pattern_redacted.pdf")
+    with fitz.open() as doc:
+        page = doc.new_page(width=400, height=300)
+        page.insert_image(fitz.Rect(origin, origin, origin + width * scale, origin + height * scale),
+                          stream=buffer.getvalue())
+        doc.save(input_path)
+
+    boxes = [(100.7, 80.2, 201.3, 150.9), (50.4, 50.6, 53.1, 52.2), (290.9, 120.1, 349.8, 199.7),
+             (170.25, 60.75, 171.0, 61.5)]
+    rects_by_page = {1: [fitz.Rect(box) for box in boxes]}
+    # The verifier itself must notice the pattern before it is redacted
+    with fitz.open(input_path) as doc:
+        if verify_redactions(doc, rects_by_page, image_mode="pixels")["passed"]:
+            return {"success": False, "error": "verification passed on the unredacted pattern"}
+
+    redactions = [{"page": 1, "x": x0 / 400, "y": y0 / 300, "width": (x1 - x0) / 400, "height": (y1 - y0) / 300,
+                   "color": "#000000"} for x0, y0, x1, y1 in boxes]
+    result = run_redaction(input_path, output_path, redactions, image_mode="pixels", verify=True)
+    if not result["success"]:
+        return result
+
+    with fitz.open(output_path) as doc:
+        pix = fitz.Pixmap(doc, doc[0].get_image_info(xrefs=True)[0]["xref"])
+        image = Image.frombytes("L" if pix.n == 1 else "RGB", (pix.width, pix.height), pix.samples).convert("L")
+    for x0, y0, x1, y1 in boxes:
+        # Every pixel the box overlaps at all
+        area = (math.floor((x0 - origin) / scale), math.floor((y0 - origin) / scale),
+                math.ceil((x1 - origin) / scale), math.ceil((y1 - origin) / scale))
+        survivors = {0, 128} & set(image.crop(area).getdata())
+        if survivors:
+            return {"success": False, "error": f"pattern values {sorted(survivors)} left under box {area}"}
+    return result
+
+
+def fresh_watermark(input_path, output_path, **kwargs):
+    # An existing output of the same job would be resumed instead of watermarked again
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    return add_watermark(input_path, output_path, **kwargs)
+
+
+def reopen_many(path, times, cached):
+    """Open path repeatedly like a long-lived worker serving jobs on one file"""
+    cache = DocumentCache(max_entries=2) if cached else None
+    for _ in range(times):
+        doc = cache.get(path) if cached else open_pdf(path)
+        doc[doc.page_count - 1].get_text()
+        if not cached:
+            doc.close()
+    if cached:
+        cache.clear()
+    return {"success": True}
+
+
+def check_pipeline(result):
+    """Fail a pipelined case whose in-flight items exceeded the queue depth (peak memory bound)"""
+    stats = result.get("pipeline") if result.get("success") else None
+    if stats and stats["max_in_flight"] > stats["queue_depth"]:
+        return {"success": False,
+                "error": f"{stats['max_in_flight']} items in flight, queue depth {stats['queue_depth']}"}
+    return result
+
+
+def run_extract_result(pdf_path, output_path, channel):
+    """
+    Extract images and hand the result over the way the backend gets it:
+    written out as JSON (base64 data) or as a framed result, then read back
+    and decoded to raw image bytes.
+    """
+    import base64
+
+    framed = channel == "framed"
+    result = extract_images_from_pdf(pdf_path, binary=framed)
+    if not result["success"]:
+        return result
+    with open(output_path, "wb") as f:
+        if framed:
+            write_framed(f, result)
+        else:
+            f.write(json.dumps(result).encode("utf-8"))
+
+    with open(output_path, "rb") as f:
+        received = read_framed(f) if framed else json.loads(f.read())
+    images = [image["data"] if framed else base64.b64decode(image["data"]) for image in received["images"]]
+    if len(images) != result["extracted_count"]:
+        return {"success": False, "error": "image count changed on the way through"}
+    return {"success": True, "metrics": {"output_bytes": os.path.getsize(output_path),
+                                         "image_bytes": sum(len(data) for data in images)}}
+
+
+def with_scratch_metrics(result):
+    """Report how often a batch held back work for scratch space"""
+    if result.get("success") and result.get("scratch"):
+        result["metrics"] = {"scratch_peak": result["scratch"]["peak"], "held_back": result["scratch"]["held_back"]}
+    return result
+
+
+def check_auto_saving(result):
+    """Fail an auto-format case whose output came out larger than the fixed JPEG settings"""
+    encoding = result.get("encoding") if result.get("success") else None
+    if encoding is None:
+        return result
+    if encoding["bytes_saved"] < 0:
+        return {"success": False,
+                "error": f"auto output {encoding['output_bytes']} bytes, fixed {encoding['fixed_bytes']} bytes"}
+    result["metrics"] = {"bytes_saved": encoding["bytes_saved"]}
+    return result
+
+
+def check_memory(result):
+    """Fail a case whose estimated bytes in flight went over its memory budget without need"""
+    stats = result.get("memory") if result.get("success") else None
+    if stats and stats["peak"] > stats["budget"] and not stats["oversized"]:
+        return {"success": False, "error": f"peak {stats['peak']} bytes over the budget of {stats['budget']}"}
+    if result.get("success"):
+        result["metrics"] = {"memory_peak": stats["peak"], "memory_waits": stats["waits"]}
+    return result
+
+
+def build_cases(paths, work_dir):
+    """
+    Return [(name, callable[, setup])]; every callable returns a result dict
+    with 'success' (and optionally 'metrics', copied into the report). The
+    optional setup callable runs once, untimed, first.
+    """
+    cases = []
+
+    def out(name):
+        return os.path.join(work_dir, name)
+
+    for doc_name in ("tiny_pages", "huge_page"):
+        for cached in (False, True):
+            cases.append((
+                f"open/{doc_name}/x20/{'cached' if cached else 'uncached'}",
+                lambda d=doc_name, c=cached: reopen_many(paths[d], 20, c),
+            ))
+
+    for doc_name, dpis in CONVERT_DPIS.items():
+        for dpi in dpis:
+            for fmt in ("jpg", "png"):
+                cases.append((
+                    f"convert/{doc_name}/{dpi}dpi/{fmt}",
+                    lambda d=doc_name, dpi=dpi, fmt=fmt: convert_pdf_to_images(
+                        paths[d], out("convert.zip"), dpi=dpi, fmt=fmt),
+                ))
+
+    for doc_name in CONVERT_DPIS:
+        cases.append((
+            f"convert/{doc_name}/150dpi/auto",
+            lambda d=doc_name: convert_pdf_to_images(paths[d], out("auto.zip"), dpi=150, fmt="auto"),
+        ))
+
+    # Photographic pages must never come out larger in auto mode than with the fixed settings
+    for doc_name in ("scanned", "gray_photo"):
+        cases.append((
+            f"convert/{doc_name}/150dpi/auto",
+            lambda d=doc_name: check_auto_saving(convert_pdf_to_images(paths[d], out("auto.zip"), dpi=150,
+                                                                       fmt="auto", compare_fixed=True)),
+        ))
+
+    for output_mode, target in (("dir", "images_dir"), ("tar-stream", "images.tar")):
+        cases.append((
+            f"convert/text_heavy/150dpi/jpg/{output_mode}",
+            lambda m=output_mode, t=target: convert_pdf_to_images(paths["text_heavy"], out(t), dpi=150,
+                                                                  output_mode=m),
+        ))
+
+    # Serial loop versus render/encode/write pipeline (PIPELINE_WORKERS encoder threads)
+    for workers in (0, PIPELINE_WORKERS):
+        mode = "pipelined" if workers else "serial"
+        for fmt in ("jpg", "png"):
+            cases.append((
+                f"convert/text_heavy/300dpi/{fmt}/{mode}",
+                lambda f=fmt, w=workers: check_pipeline(convert_pdf_to_images(
+                    paths["text_heavy"], out("pipeline.zip"), dpi=300, fmt=f, workers=w)),
+            ))
+        cases.append((
+            f"images/extract/image_unique/{mode}",
+            lambda w=workers: check_pipeline(extract_images_from_pdf(paths["image_unique"], workers=w)),
+        ))
+
+    # Tight memory budget: pages wait for each other instead of piling up
+    for doc_name, budget_mb in (("text_heavy", 64), ("huge_page", 64), ("image_unique", 8)):
+        cases.append((
+            f"convert/{doc_name}/300dpi/jpg/budget_{budget_mb}mb",
+            lambda d=doc_name, b=budget_mb: check_memory(convert_pdf_to_images(
+                paths[d], out("budget.zip"), dpi=300, workers=PIPELINE_WORKERS, queue_depth=2 * PIPELINE_WORKERS,
+                memory_budget=b << 20)),
+        ))
+    cases.append((
+        "images/extract/image_unique/budget_2mb",
+        lambda: check_memory(extract_images_from_pdf(paths["image_unique"], workers=PIPELINE_WORKERS,
+                                                     queue_depth=2 * PIPELINE_WORKERS, memory_budget=2 << 20)),
+    ))
+
+    # Resumable job: pages staged and journaled, then packed into the ZIP
+    cases.append((
+        "convert/text_heavy/150dpi/jpg/job",
+        lambda: convert_pdf_to_images(paths["text_heavy"], out("job.zip"), dpi=150, job_id="benchmark"),
+    ))
+
+    # Several inputs in one run: one file after another versus the process pool
+    batch_docs = ["text_heavy", "tiny_pages", "image_unique", "scanned"]
+    cases.append((
+        "convert/batch/4_docs/one_by_one",
+        lambda: [convert_pdf_to_images(paths[d], out(f"batch_{d}.zip"), dpi=150) for d in batch_docs][-1],
+    ))
+    for processes in (1, PIPELINE_WORKERS):
+        cases.append((
+            f"convert/batch/4_docs/{processes}_processes",
+            lambda p=processes: convert_many([paths[d] for d in batch_docs], out("batch"), processes=p, dpi=150),
+        ))
+    # Staged chunks capped at 2 MB: new chunks wait until finished files free the scratch space
+    cases.append((
+        f"convert/batch/4_docs/{PIPELINE_WORKERS}_processes/scratch_2mb",
+        lambda: with_scratch_metrics(convert_many([paths[d] for d in batch_docs], out("batch"), processes=PIPELINE_WORKERS,
+                                           dpi=150, scratch_quota=2 << 20)),
+    ))
+
+    # One render derived into three sizes versus three full renders
+    for doc_name, dpis in (("text_heavy", (300, 150, 72)), ("huge_page", (150, 100, 72)), ("image_unique", (300, 150, 72))):
+        sizes = ",".join(str(dpi) for dpi in dpis)
+        cases.append((
+            f"convert/{doc_name}/pyramid/{sizes}",
+            lambda d=doc_name, s=sizes: convert_pdf_to_images(paths[d], out("pyramid.zip"), sizes=s),
+        ))
+        cases.append((
+            f"convert/{doc_name}/separate/{sizes}",
+            lambda d=doc_name, dpis=dpis: [convert_pdf_to_images(paths[d], out(f"separate_{dpi}.zip"), dpi=dpi)
+                                           for dpi in dpis][-1],
+        ))
+
+    for watermark_type in ("text", "image"):
+        for position in ("Center", "Tiled"):
+            mode = "tiled" if position == "Tiled" else "single"
+            cases.append((
+                f"watermark/{watermark_type}/{mode}",
+                lambda t=watermark_type, p=position: fresh_watermark(
+                    paths["text_heavy"], out("watermark.pdf"), watermark_type=t,
+                    image_path=paths["logo"], position=p),
+            ))
+
+    # Retrying a finished job: every page is already stamped and skipped
+    cases.append((
+        "watermark/text/single/rerun",
+        lambda: add_watermark(paths["text_heavy"], out("watermark_done.pdf")),
+        lambda: fresh_watermark(paths["text_heavy"], out("watermark_done.pdf")),
+    ))
+
+    for doc_name in ("text_heavy", "image_unique"):
+        with fitz.open(paths[doc_name]) as doc:
+            page_count = doc.page_count
+        redactions = grid_redactions(page_count, per_page=50)
+        cases.append((
+            f"redact/{doc_name}/50_boxes_per_page",
+            lambda d=doc_name, r=redactions: run_redaction(paths[d], out("redacted.pdf"), r),
+        ))
+        # Same job with the output re-read under every box before it is written
+        cases.append((
+            f"redact/{doc_name}/50_boxes_per_page/verified",
+            lambda d=doc_name, r=redactions: run_redaction(paths[d], out("redacted.pdf"), r, verify=True),
+        ))
+
+    for doc_name in ("image_shared", "image_unique", "scanned"):
+        for mode in ("extract", "remove", "analyze"):
+            cases.append((
+                f"images/{mode}/{doc_name}",
+                lambda d=doc_name, m=mode: extract_images_from_pdf(paths[d], mode=m),
+            ))
+
+    # Handing the extracted images over: JSON with base64 versus a framed result
+    for channel in ("json", "framed"):
+        cases.append((
+            f"images/extract/image_unique/result_{channel}",
+            lambda c=channel: run_extract_result(paths["image_unique"], out(f"result.{c}"), c),
+        ))
+
+    # Scanned pages: drop whole images versus blank only the covered pixels
+    with fitz.open(paths["scanned"]) as doc:
+        redactions = grid_redactions(doc.page_count, per_page=10)
+    for image_mode in ("remove", "pixels"):
+        cases.append((
+            f"redact/scanned/10_boxes_per_page/{image_mode}",
+            lambda m=image_mode, r=redactions: run_redaction(paths["scanned"], out("redacted_scan.pdf"), r,
+                                                             image_mode=m, verify=True),
+        ))
+    cases.append(("redact/pattern/pixels", lambda: check_pixel_redaction(work_dir)))
+
+    return cases
+
+
+def time_case(func, repeat):
+    """Run func repeat times, returning (timings, last result)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def compare_to_baseline(results, baseline, max_slowdown):
+    """Return the cases whose median is more than max_slowdown times the baseline median"""
+    baseline_medians = {r["name"]: r["median_s"] for r in baseline.get("results", []) if r.get("success")}
+    regressions = []
+    for result in results:
+        previous = baseline_medians.get(result["name"])
+        if not result.get("success") or not previous:
+            continue
+        ratio = result["median_s"] / previous
+        result["baseline_median_s"] = previous
+        result["ratio"] = round(ratio, 3)
+        if ratio > max_slowdown:
+            regressions.append({"name": result["name"], "ratio": result["ratio"]})
+    return regressions
+
+
+def run_benchmarks(corpus_dir=None, scale=1.0, repeat=3, only=None, include_startup=False, startup_budget=None):
+    keep_corpus = corpus_dir is not None
+    corpus_dir = corpus_dir or tempfile.mkdtemp(prefix="localpdf_corpus_")
+    work_dir = tempfile.mkdtemp(prefix="localpdf_bench_")
+    try:
+        paths = corpus.build_corpus(corpus_dir, scale=scale)
+        results = []
+        if include_startup:
+            results.extend(r for r in startup.run_startup_benchmarks(work_dir, budget_s=startup_budget)
+                           if not only or re.search(only, r["name"]))
+        for name, func, *setup in build_cases(paths, work_dir):
+            if only and not re.search(only, name):
+                continue
+            for prepare in setup:
+                prepare()
+            timings, result = time_case(func, repeat)
+            entry = {
+                "name": name,
+                "success": bool(result and result.get("success")),
+                "runs": len(timings),
+                "min_s": round(min(timings), 4),
+                "median_s": round(statistics.median(timings), 4),
+            }
+            if result and result.get("metrics"):
+                entry["metrics"] = result["metrics"]
+            if not entry["success"]:
+                entry["error"] = (result or {}).get("error", "unknown error")
+            results.append(entry)
+            print(f"{name}: {entry['median_s']:.3f}s", file=sys.stderr)
+        return results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        if not keep_corpus:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Python PDF tools on a synthetic corpus.")
+    parser.add_argument("--corpus-dir", help="Directory to generate/reuse the corpus in (default: temporary)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply corpus page counts by this factor")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case")
+    parser.add_argument("--only", help="Regex; run only the cases whose name matches")
+    parser.add_argument("--startup", action="store_true", help="Include cold-start and import-time cases")
+    parser.add_argument("--startup-budget", type=float,
+                        help="Fail when a cold start (best run) takes longer than this many seconds")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare against")
+    parser.add_argument("--max-slowdown", type=float, default=1.25,
+                        help="Fail when a case's median exceeds baseline median times this factor")
+
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.corpus_dir, args.scale, max(1, args.repeat), args.only,
+                             include_startup=args.startup or args.startup_budget is not None,
+                             startup_budget=args.startup_budget)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pymupdf": fitz.VersionBind,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scale": args.scale,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    exit_code = 0 if all(r["success"] for r in results) else 1
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.max_slowdown)
+        report["max_slowdown"] = args.max_slowdown
+        report["regressions"] = regressions
+        if regressions:
+            exit_code = 1
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    REPORT_STREAM.write(json.dumps(report, indent=2).encode("utf-8") + b"\n")
+    REPORT_STREAM.flush()
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
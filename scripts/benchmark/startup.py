@@ -0,0 +1,115 @@
+##
+ # LocalPDF Studio - Offline PDF Toolkit
+ # ======================================
+ #
+ # @author      Md. Alinur Hossain <alinur1160@gmail.com>
+ # @license     AGPL 3.0 (GNU Affero General Public License version 3)
+ # @website     https://alinur1.github.io/LocalPDF_Studio_Website/
+ # @repository  https://github.com/Alinur1/LocalPDF_Studio
+ #
+ # Copyright (c) 2025 Md. Alinur Hossain. All rights reserved.
+ #
+ # Architecture:
+ # - Frontend: Electron + HTML/CSS/JS
+ # - Backend: ASP.NET Core Web API, Python
+ # - PDF Engine: PdfSharp + Mozilla PDF.js
+##
+
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def startup_commands(work_dir):
+    """
+    Return {name: argv} for the cheap invocations the .NET services hit on
+    every request: --help and the "input not found" validation error.
+    """
+    missing_pdf = os.path.join(work_dir, "missing.pdf")
+    request_file = os.path.join(work_dir, "extract_request.json")
+    with open(request_file, "w", encoding="utf-8") as f:
+        json.dump({"file_path": missing_pdf, "mode": "extract"}, f)
+
+    def script(tool):
+        return os.path.join(SCRIPTS_DIR, tool, f"{tool}.py")
+
+    return {
+        "convert_pdf_images/help": [script("convert_pdf_images"), "--help"],
+        "convert_pdf_images/missing_input": [script("convert_pdf_images"), missing_pdf,
+                                             os.path.join(work_dir, "out.zip"), "--json"],
+        "add_watermark/help": [script("add_watermark"), "--help"],
+        "add_watermark/missing_input": [script("add_watermark"), missing_pdf,
+                                        os.path.join(work_dir, "out.pdf"), "--json"],
+        "redact_pdf/help": [script("redact_pdf"), "--help"],
+        "redact_pdf/missing_input": [script("redact_pdf"), missing_pdf,
+                                     os.path.join(work_dir, "out.pdf"), "--redactions", "[]"],
+        "extract_images/missing_input": [script("extract_images"), request_file],
+    }
+
+
+def parse_importtime(stderr, top=10):
+    """
+    Parse `python -X importtime` output into the slowest imports.
+
+    Returns (total_us, [{"module", "self_us", "cumulative_us"}]) where total
+    is the sum of cumulative times of top-level imports.
+    """
+    entries = []
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue
+        # Nesting is shown by two extra spaces of indentation per level
+        if len(name) - len(name.lstrip()) <= 1:
+            total_us += cumulative_us
+        entries.append({"module": name.strip(), "self_us": self_us, "cumulative_us": cumulative_us})
+    entries.sort(key=lambda e: e["cumulative_us"], reverse=True)
+    return total_us, entries[:top]
+
+
+def measure_startup(argv, repeat=5):
+    """Best-of-N wall time for a cold interpreter running argv, plus an import-time report"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+
+    completed = subprocess.run([sys.executable, "-X", "importtime"] + argv,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    import_total_us, slowest = parse_importtime(completed.stderr)
+    return {
+        "runs": len(timings),
+        "min_s": round(min(timings), 4),
+        "median_s": round(statistics.median(timings), 4),
+        "import_total_ms": round(import_total_us / 1000, 2),
+        "slowest_imports": slowest,
+    }
+
+
+def run_startup_benchmarks(work_dir, repeat=5, budget_s=None):
+    """
+    Time every startup command. With budget_s set, a case whose best run
+    exceeds the budget is reported as failed.
+    """
+    results = []
+    for name, argv in startup_commands(work_dir).items():
+        entry = {"name": f"startup/{name}"}
+        entry.update(measure_startup(argv, repeat))
+        entry["success"] = budget_s is None or entry["min_s"] <= budget_s
+        if not entry["success"]:
+            entry["error"] = f"cold start {entry['min_s']:.3f}s exceeds budget {budget_s:.3f}s"
+        results.append(entry)
+        print(f"{entry['name']}: {entry['min_s']:.3f}s (imports {entry['import_total_ms']}ms)", file=sys.stderr)
+    return results
@@ -17,108 +17,774 @@
 
 
 import argparse
-import fitz  # PyMuPDF
+import io
 import os
 import sys
 import json
-import zipfile
-from PIL import Image
+import re
+import shutil
+import time
+from contextlib import ExitStack, nullcontext
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
 
-def convert_pdf_to_images(input_path, output_path, dpi=150, fmt="jpg", include_page_numbers=True):
+from pdf_common.doc_loader import cached_documents, enable_cache, open_document
+from pdf_common.pipeline import run_pipeline
+from pdf_common.journal import JobJournal
+from pdf_common.scheduler import MemoryBudget, estimate_page_cost, size_pool
+from pdf_common.scratch import ScratchSpace
+from pdf_common.sinks import SINK_MODES, DirectorySink, claim_stdout, open_sink
+
+# Auto format selection (--format auto)
+PROBE_MAX_SIDE = 256        # probe render size in pixels
+GRAY_TOLERANCE = 10         # max channel spread on the probe still treated as gray
+LINE_ART_COVERAGE = 0.50    # share of clip pixels equal to their left neighbour
+BILEVEL_COVERAGE = 0.99     # share of near-black/near-white pixels for 1-bit output
+AUTO_PNG_COMPRESS_LEVEL = 3 # flat line art compresses well even at a fast level
+
+# Multi-input mode (convert_many)
+CHUNKS_PER_PROCESS = 4      # large files are cut so every process gets several chunks
+MIN_CHUNK_PAGES = 8         # never split a file into chunks smaller than this
+
+
+def parse_sizes(sizes):
+    """
+    Parse a pyramid size list like "300,150,72,w256".
+
+    Plain numbers are DPIs, "w<N>" is a fixed pixel width. Returns
+    [(label, kind, value)] with labels such as "150dpi" and "w256".
+    """
+    if isinstance(sizes, str):
+        sizes = sizes.split(",")
+    specs = []
+    seen = set()
+    for size in sizes:
+        size = str(size).strip().lower()
+        if not size:
+            continue
+        if size.startswith("w"):
+            width = int(size[1:])
+            if width <= 0:
+                raise ValueError(f"Invalid thumbnail width: {size}")
+            spec = (f"w{width}", "width", width)
+        else:
+            dpi = int(size[:-3] if size.endswith("dpi") else size)
+            if dpi <= 0:
+                raise ValueError(f"Invalid DPI: {size}")
+            spec = (f"{dpi}dpi", "dpi", dpi)
+        if spec[0] not in seen:
+            seen.add(spec[0])
+            specs.append(spec)
+    if not specs:
+        raise ValueError("No sizes given")
+    return specs
+
+
+def pyramid_render_dpi(page_rect, size_specs):
+    """The single DPI a page is rendered at so every requested size can be derived by downsampling"""
+    needed = []
+    for _, kind, value in size_specs:
+        if kind == "dpi":
+            needed.append(value)
+        else:
+            needed.append(value * 72.0 / page_rect.width)
+    return max(needed)
+
+
+def derive_sizes(img, render_dpi, size_specs):
+    """Yield (label, image) for every size, downsampled from the one rendered image"""
+    from PIL import Image
+
+    targets = []
+    for label, kind, value in size_specs:
+        scale = value / render_dpi if kind == "dpi" else value / img.width
+        targets.append((label, (max(1, round(img.width * scale)), max(1, round(img.height * scale)))))
+
+    # Walk from the largest size down so each size is derived from the
+    # previous (smaller) image instead of the full render every time.
+    derived = {}
+    source = img
+    for label, size in sorted(targets, key=lambda t: t[1][0], reverse=True):
+        if size != source.size:
+            # Integer reduction is very cheap; the remainder is resampled with
+            # a box filter (area averaging), like a lower-DPI render would do.
+            factor = min(source.width // size[0], source.height // size[1])
+            if factor >= 2:
+                source = source.reduce(factor)
+            # A one pixel difference is rounding noise, not worth a resample
+            if abs(size[0] - source.width) > 1 or abs(size[1] - source.height) > 1:
+                source = source.resize(size, Image.BOX)
+        derived[label] = source
+
+    for label, _ in targets:
+        yield label, derived[label]
+
+
+def encode_image(img, fmt, png_compress_level=6):
+    buffer = io.BytesIO()
+    if fmt in ["jpg", "jpeg"]:
+        img.save(buffer, "JPEG", quality=95)
+    else:
+        img.save(buffer, "PNG", compress_level=png_compress_level)
+    return buffer.getvalue()
+
+
+def analyze_page(page, display_list, zoom):
+    """
+    Decide how to encode a page in auto mode from two tiny probe renders.
+
+    The probes are drawn from the page's display list, which the full render
+    reuses, so the content stream is only interpreted once.
+
+    Returns (grayscale, line_art): grayscale pages are rendered with csGRAY,
+    line art (flat areas of one exact value) is stored as PNG and anything
+    photographic, including scans whose noise leaves no two neighbours alike,
+    as JPEG. Color is judged on the whole page scaled down; line art on a
+    clip from the middle of the page at the render zoom, because scaling
+    down averages scan noise into flat areas and anti-aliased text into
+    gradients.
+    """
+    import fitz  # PyMuPDF
+    from PIL import Image, ImageChops
+
+    rect = page.rect
+    probe_zoom = min(1.0, PROBE_MAX_SIDE / max(rect.width, rect.height))
+    pix = display_list.get_pixmap(matrix=fitz.Matrix(probe_zoom, probe_zoom), alpha=False)
+    probe = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+
+    r, g, b = probe.split()
+    spread = max(ImageChops.difference(x, y).getextrema()[1] for x, y in ((r, g), (g, b), (r, b)))
+
+    half = PROBE_MAX_SIDE / zoom / 2
+    center_x, center_y = (rect.x0 + rect.x1) / 2, (rect.y0 + rect.y1) / 2
+    clip = fitz.Rect(center_x - half, center_y - half, center_x + half, center_y + half) & rect
+    pix = display_list.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip, colorspace=fitz.csGRAY, alpha=False)
+    luma = Image.frombytes("L", [pix.width, pix.height], pix.samples)
+
+    # Exact differences to the left neighbour: zero wherever the area is flat
+    flat = ImageChops.difference(luma, ImageChops.offset(luma, 1, 0)).histogram()[0]
+    line_art = flat >= LINE_ART_COVERAGE * luma.width * luma.height
+
+    return spread <= GRAY_TOLERANCE, line_art
+
+
+def is_bilevel(gray_img):
+    """True when a grayscale render is (almost) only black and white, like a B/W scan"""
+    histogram = gray_img.histogram()
+    extremes = sum(histogram[:48]) + sum(histogram[208:])
+    return extremes >= BILEVEL_COVERAGE * gray_img.width * gray_img.height
+
+
+def encode_image_with_stats(img, fmt, stats, baseline_img=None):
+    """Encode img and account size/encode time; with baseline_img also encode the fixed-settings JPEG for comparison"""
+    start = time.perf_counter()
+    data = encode_image(img, fmt, png_compress_level=AUTO_PNG_COMPRESS_LEVEL)
+    stats["encode_s"] += time.perf_counter() - start
+    stats["output_bytes"] += len(data)
+
+    if baseline_img is not None:
+        start = time.perf_counter()
+        baseline = encode_image(baseline_img.convert("RGB"), "jpg")
+        stats["fixed_encode_s"] += time.perf_counter() - start
+        stats["fixed_bytes"] += len(baseline)
+    return data
+
+
+def convert_pdf_to_images(input_path, output_path, dpi=150, fmt="jpg", include_page_numbers=True, sizes=None,
+                          compare_fixed=False, output_mode="zip", workers=None, queue_depth=None, job_id=None,
+                          pages=None, memory_budget=None):
+    """
+    Render every page to an image and zip them.
+
+    output_mode picks the sink (see pdf_common.sinks): a ZIP file, a plain
+    directory, or a ZIP/tar stream to a pipe or stdout (output_path "-").
+    Images are written to the sink as soon as each page is encoded.
+
+    Pages are rendered, encoded and written in a pipeline (see
+    pdf_common.pipeline): workers encoder threads, at most queue_depth
+    rendered pages in memory. workers=0 processes pages one at a time.
+    Every page's memory is estimated before it is rendered and pages are
+    only started while they fit memory_budget bytes (see
+    pdf_common.scheduler; default: half the available memory). Unless given,
+    workers and queue_depth are sized from those estimates.
+
+    With sizes (e.g. "300,150,72,w256") each page is rendered once, at the
+    largest DPI any size needs, and every size is derived from that render
+    by downsampling. Images are stored in one folder per size in the ZIP.
+
+    With a job_id the run is resumable (see pdf_common.journal): finished
+    pages are journaled, a rerun with the same ID after a crash skips them,
+    and the output is assembled once every page is done.
+
+    fmt="auto" picks per page: grayscale rendering for pages without color,
+    PNG for line art (1-bit for black-and-white pages) and JPEG for photos.
+    The result then reports output bytes and encode time; compare_fixed
+    additionally encodes every image with the fixed JPEG settings to report
+    the savings.
+
+    pages limits the run to the given 0-based page indices (convert_many
+    uses it to split large files across processes); names still carry the
+    real page numbers.
+    """
+    journal = None
     try:
         if not os.path.exists(input_path):
             return {"success": False, "error": f"Input file not found: {input_path}"}
 
         fmt = fmt.lower()
-        if fmt not in ["jpg", "jpeg", "png"]:
+        if fmt not in ["jpg", "jpeg", "png", "auto"]:
             return {"success": False, "error": f"Unsupported format: {fmt}"}
 
-        # Create temp directory for images
-        temp_dir = os.path.join(os.path.dirname(output_path), f"pdf_to_img_{os.getpid()}")
-        os.makedirs(temp_dir, exist_ok=True)
+        size_specs = parse_sizes(sizes) if sizes else None
+
+        if output_mode not in SINK_MODES:
+            return {"success": False, "error": f"Unsupported output mode: {output_mode}"}
 
-        doc = fitz.open(input_path)
-        total_pages = doc.page_count
+        # Heavy imports are deferred until the input has been validated
+        import fitz  # PyMuPDF
+        from PIL import Image
 
         base_name = os.path.splitext(os.path.basename(input_path))[0]
-        image_files = []
+        auto = fmt == "auto"
+        stats = {"pages": {}, "output_bytes": 0, "encode_s": 0.0, "fixed_bytes": 0, "fixed_encode_s": 0.0}
+
+        def page_render_dpi(page):
+            return pyramid_render_dpi(page.rect, size_specs) if size_specs else dpi
 
-        for i, page in enumerate(doc):
-            zoom = dpi / 72.0
-            mat = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
+        def render_pages(doc):
+            # Render stage: runs in this thread, the only one touching the document
+            for i in page_indices:
+                if journal and journal.is_done(i):
+                    continue
+                budget.acquire(costs[i])
+                page = doc[i]
+                render_dpi = page_render_dpi(page)
+                zoom = render_dpi / 72.0
+                mat = fitz.Matrix(zoom, zoom)
+
+                if auto:
+                    source = page.get_displaylist()
+                    grayscale, line_art = analyze_page(page, source, zoom)
+                    page_fmt = "png" if line_art else "jpg"
+                else:
+                    source = page
+                    grayscale, line_art, page_fmt = False, False, fmt
+
+                if grayscale:
+                    pix = source.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+                    img = Image.frombytes("L", [pix.width, pix.height], pix.samples)
+                else:
+                    pix = source.get_pixmap(matrix=mat, alpha=False)
+                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                pix = source = page = None
+
+                yield i, img, render_dpi, page_fmt, grayscale, line_art
+                img = None
+
+        def encode_page(rendered):
+            # Encode stage: Pillow only, safe to run on the worker threads
+            i, img, render_dpi, page_fmt, grayscale, line_art = rendered
+            try:
+                return encode_rendered(i, img, render_dpi, page_fmt, grayscale, line_art)
+            finally:
+                # The rendered pixels are dropped once encoded
+                budget.release(costs[i])
+
+        def encode_rendered(i, img, render_dpi, page_fmt, grayscale, line_art):
+            page_stats = {"output_bytes": 0, "encode_s": 0.0, "fixed_bytes": 0, "fixed_encode_s": 0.0}
+
+            bilevel = auto and grayscale and line_art and is_bilevel(img)
+            choice = f"{page_fmt}_{'bilevel' if bilevel else 'gray' if grayscale else 'rgb'}" if auto else None
 
             if include_page_numbers:
-                file_name = f"{base_name}_page_{i + 1:03d}.{fmt}"
+                file_name = f"{base_name}_page_{i + 1:03d}.{page_fmt}"
             else:
-                file_name = f"{base_name}_{i + 1}.{fmt}"
+                file_name = f"{base_name}_{i + 1}.{page_fmt}"
 
-            image_path = os.path.join(temp_dir, file_name)
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-
-            if fmt in ["jpg", "jpeg"]:
-                img.save(image_path, "JPEG", quality=95)
+            if size_specs:
+                outputs = [(f"{label}/{file_name}", resized)
+                           for label, resized in derive_sizes(img, render_dpi, size_specs)]
             else:
-                img.save(image_path, "PNG", compress_level=6)
+                outputs = [(file_name, img)]
 
-            image_files.append(image_path)
+            entries = []
+            for entry_name, out_img in outputs:
+                if auto:
+                    final_img = out_img.convert("1") if bilevel else out_img
+                    data = encode_image_with_stats(final_img, page_fmt, page_stats,
+                                                   baseline_img=out_img if compare_fixed else None)
+                else:
+                    data = encode_image(out_img, page_fmt)
+                entries.append((entry_name, data))
+            return i, entries, choice, page_stats
 
-        # Zip all images
-        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-            for f in image_files:
-                zipf.write(f, os.path.basename(f))
+        def account(choice, page_stats):
+            if choice:
+                stats["pages"][choice] = stats["pages"].get(choice, 0) + 1
+            for key, value in page_stats.items():
+                stats[key] += value
 
-        # Cleanup
-        for f in image_files:
-            try:
-                os.remove(f)
-            except Exception:
-                pass
-        try:
-            os.rmdir(temp_dir)
-        except Exception:
-            pass
+        if job_id:
+            journal = JobJournal(job_id, input_path, {
+                "dpi": dpi, "format": fmt, "sizes": sizes, "include_page_numbers": include_page_numbers,
+                "compare_fixed": compare_fixed, "pages": None if pages is None else list(pages),
+            })
+            # Pages are staged in the job directory (or go straight into the
+            # output directory) and only copied into the archive at the end
+            stage = nullcontext(DirectorySink(output_path) if output_mode == "dir" else journal.staging)
+            for record in journal.records():
+                account(record["info"]["choice"], record["info"]["stats"])
+        else:
+            stage = open_sink(output_mode, output_path)
+
+        with open_document(input_path) as doc, stage as sink:
+            total_pages = doc.page_count
+            page_indices = range(total_pages) if pages is None else [i for i in pages if 0 <= i < total_pages]
+            budget = MemoryBudget(memory_budget)
+            costs = {i: estimate_page_cost(doc[i], page_render_dpi(doc[i]))
+                     for i in page_indices if not (journal and journal.is_done(i))}
+            workers, queue_depth = size_pool(list(costs.values()), budget, workers, queue_depth)
+
+            def write_page(encoded):
+                # Write stage: a single thread, so pages reach the sink in order
+                i, entries, choice, page_stats = encoded
+                for entry_name, data in entries:
+                    sink.add(entry_name, data)
+                account(choice, page_stats)
+                if journal:
+                    journal.complete(i, [entry_name for entry_name, _ in entries],
+                                     {"choice": choice, "stats": page_stats})
 
-        return {
+            pipeline_stats = run_pipeline(render_pages(doc), encode_page, write_page,
+                                          workers=workers, queue_depth=queue_depth)
+
+        if journal:
+            if output_mode != "dir":
+                with open_sink(output_mode, output_path) as sink:
+                    for entry_name in journal.entries():
+                        sink.add(entry_name, journal.read(entry_name))
+            journal.finish()
+
+        result = {
             "success": True,
             "page_count": total_pages,
+            "pages_converted": len(page_indices),
             "output": output_path,
+            "output_mode": output_mode,
             "format": fmt,
             "dpi": dpi,
+            "pipeline": pipeline_stats,
+            "memory": budget.stats(),
         }
+        if journal:
+            result["job"] = {"id": job_id, "resumed_pages": journal.resumed_pages}
+        if size_specs:
+            result["sizes"] = [label for label, _, _ in size_specs]
+        if auto:
+            encoding = {
+                "pages": stats["pages"],
+                "output_bytes": stats["output_bytes"],
+                "encode_s": round(stats["encode_s"], 4),
+            }
+            if compare_fixed:
+                encoding.update({
+                    "fixed_bytes": stats["fixed_bytes"],
+                    "fixed_encode_s": round(stats["fixed_encode_s"], 4),
+                    "bytes_saved": stats["fixed_bytes"] - stats["output_bytes"],
+                    "encode_s_saved": round(stats["fixed_encode_s"] - stats["encode_s"], 4),
+                })
+            result["encoding"] = encoding
+        return result
 
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+    finally:
+        # An unfinished job keeps its directory so a retry can resume it
+        if journal:
+            journal.close()
+
+
+def expand_inputs(patterns):
+    """
+    Turn command line inputs into PDF paths: plain paths, glob patterns
+    (expanded here because Windows shells don't) and folders (every PDF
+    directly inside). An existing file is always a plain path, even when
+    its name contains glob characters ("Invoice [2024].pdf"). Order is kept
+    and duplicates are dropped.
+    """
+    import glob
+
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        if os.path.isfile(pattern):
+            matches = [pattern]
+        elif os.path.isdir(pattern):
+            matches = sorted(os.path.join(pattern, name) for name in os.listdir(pattern)
+                             if name.lower().endswith(".pdf") and os.path.isfile(os.path.join(pattern, name)))
+        elif any(c in pattern for c in "*?["):
+            matches = sorted(glob.glob(pattern))
+        else:
+            matches = [pattern]
+        for path in matches:
+            key = os.path.normcase(os.path.abspath(path))
+            if key not in seen:
+                seen.add(key)
+                paths.append(path)
+    return paths
+
+
+def is_multi_input(patterns):
+    """True when the inputs name anything but a single plain file"""
+    return len(patterns) > 1 or any(not os.path.isfile(p) and (os.path.isdir(p) or any(c in p for c in "*?["))
+                                    for p in patterns)
+
+
+def plan_chunks(page_counts, processes):
+    """
+    Split files into (file index, first page, end page) chunks, largest
+    first.
+
+    Chunks hold about 1/CHUNKS_PER_PROCESS of one process's share of all
+    pages, so a file much larger than the rest is spread over every process
+    instead of keeping one busy while the others sit idle; small files stay
+    whole. Starting the largest chunks first keeps a long one from being
+    picked up last.
+    """
+    total = sum(page_counts)
+    chunk_pages = max(MIN_CHUNK_PAGES, -(-total // (max(1, processes) * CHUNKS_PER_PROCESS)))
+    chunks = []
+    for index, count in enumerate(page_counts):
+        for first in range(0, count, chunk_pages):
+            chunks.append((index, first, min(count, first + chunk_pages)))
+    chunks.sort(key=lambda chunk: chunk[1] - chunk[2])
+    return chunks
+
+
+def _convert_chunk(task):
+    """Worker entry point: render one page range of one file into a folder"""
+    input_path, target, first, end, workers, options = task
+    return convert_pdf_to_images(input_path, target, output_mode="dir", workers=workers,
+                                 pages=range(first, end), **options)
+
+
+def _folder_entries(folder):
+    """Entry names of the files under folder, in natural (page number) order"""
+    names = []
+    for root, _, files in os.walk(folder):
+        prefix = os.path.relpath(root, folder).replace(os.sep, "/")
+        names.extend(name if prefix == "." else f"{prefix}/{name}" for name in files)
+    return sorted(names, key=lambda name: [int(t) if t.isdigit() else t for t in re.split(r"(\d+)", name)])
+
+
+def convert_many(inputs, output_path, combined=False, output_mode="zip", processes=None, on_result=None,
+                 dpi=150, fmt="jpg", include_page_numbers=True, sizes=None, compare_fixed=False, memory_budget=None,
+                 scratch_quota=None):
+    """
+    Convert many PDFs in one invocation on a pool of worker processes.
+
+    Files are cut into page-range chunks (see plan_chunks) so the pool
+    stays busy when one input is much larger than the rest. A worker renders
+    each chunk into a scratch folder; once every chunk of a file is done its
+    images are written out and on_result(result) is called for that file,
+    in the order files finish.
+
+    Without combined, output_path is a folder receiving <name>.zip per input
+    (a <name>/ folder with output_mode "dir"). With combined, every image
+    goes into one archive at output_path under a <name>/ folder per input;
+    the stream modes need combined.
+
+    processes defaults to the CPU count; 1 converts in this process. A
+    worker renders one page at a time, so a chunk is only handed out while
+    its largest page fits memory_budget next to the chunks already running
+    (see pdf_common.scheduler); huge pages are converted one at a time.
+    Chunks are staged in a per-run scratch directory (see
+    pdf_common.scratch) that is always removed; while it holds more than
+    scratch_quota bytes, no new chunks are started.
+    Returns a summary with the file, failure and page counts.
+    """
+    start = time.perf_counter()
+    if output_mode not in SINK_MODES:
+        return {"success": False, "error": f"Unsupported output mode: {output_mode}"}
+    if not combined and output_mode not in ("zip", "dir"):
+        return {"success": False, "error": f"Output mode {output_mode} needs --combined with several inputs"}
+    if fmt.lower() not in ["jpg", "jpeg", "png", "auto"]:
+        return {"success": False, "error": f"Unsupported format: {fmt}"}
+    try:
+        size_specs = parse_sizes(sizes) if sizes else None
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+    processes = max(1, processes or os.cpu_count() or 1)
+    options = {"dpi": dpi, "fmt": fmt, "include_page_numbers": include_page_numbers, "sizes": sizes,
+               "compare_fixed": compare_fixed, "memory_budget": memory_budget}
+    budget = MemoryBudget(memory_budget)
+    summary = {"files": len(inputs), "failed": 0, "pages": 0, "output": output_path, "processes": processes}
+
+    def report(result):
+        if not result["success"]:
+            summary["failed"] += 1
+        if on_result:
+            on_result(result)
+
+    # Unique output names: two inputs called report.pdf become report/ and report_2/
+    names = []
+    used = set()
+    for path in inputs:
+        base = os.path.splitext(os.path.basename(path))[0]
+        name, n = base, 1
+        while name.lower() in used:
+            n += 1
+            name = f"{base}_{n}"
+        used.add(name.lower())
+        names.append(name)
+
+    # Documents parsed for the page counts are reused by the chunks converted
+    # in this process; worker processes keep a cache of their own
+    documents = ExitStack()
+    documents.enter_context(cached_documents())
+    page_counts = []
+    page_costs = []
+    for path in inputs:
+        try:
+            with open_document(path) as doc:
+                page_counts.append(doc.page_count)
+                page_costs.append([estimate_page_cost(page, pyramid_render_dpi(page.rect, size_specs)
+                                                      if size_specs else dpi) for page in doc])
+        except Exception as e:
+            page_counts.append(None)
+            page_costs.append([])
+            report({"success": False, "input": path, "error": f"Cannot open {path}: {e}"})
+
+    files = [{"path": path, "name": name, "pages": count, "chunks": {}, "left": 0}
+             for path, name, count in zip(inputs, names, page_counts)]
+    chunks = plan_chunks([count or 0 for count in page_counts], processes)
+    chunk_costs = [max(page_costs[index][first:end]) for index, first, end in chunks]
+    for index, _, _ in chunks:
+        files[index]["left"] += 1
+    summary["processes"] = processes = min(processes, max(1, len(chunks)))
+    if processes > 1:
+        # Not needed here any more, and not to be inherited by the workers
+        documents.close()
+
+    direct = output_mode == "dir"
+    scratch = None
+    pool = None
+    try:
+        # Folder output is written in place and needs no scratch space
+        scratch = None if direct else ScratchSpace("batch", quota=scratch_quota)
+        os.makedirs(output_path if direct or not combined else os.path.dirname(os.path.abspath(output_path)),
+                    exist_ok=True)
+
+        def chunk_target(index, first):
+            if direct:
+                return os.path.join(output_path, files[index]["name"])
+            return os.path.join(scratch.path, f"{index}_{first}")
+
+        tasks = [(files[index]["path"], chunk_target(index, first), first, end,
+                  None if processes == 1 else 0, options)
+                 for index, first, end in chunks]
+
+        if processes > 1:
+            from collections import deque
+            from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+            # Chunks of one file that land on the same worker share its parsed document
+            pool = ProcessPoolExecutor(max_workers=processes, initializer=enable_cache)
+
+            def completed():
+                # Hand out chunks in order while they fit the memory budget and,
+                # as long as running chunks will free some, the scratch space
+                waiting = deque(range(len(tasks)))
+                running = {}
+                while waiting or running:
+                    while waiting and len(running) < processes \
+                            and (direct or not running or scratch.has_room()) \
+                            and budget.try_acquire(chunk_costs[waiting[0]]):
+                        n = waiting.popleft()
+                        running[pool.submit(_convert_chunk, tasks[n])] = n
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        n = running.pop(future)
+                        budget.release(chunk_costs[n])
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            result = {"success": False, "error": str(e) or type(e).__name__}
+                        yield n, result
+        else:
+            def completed():
+                for n, task in enumerate(tasks):
+                    yield n, _convert_chunk(task)
+
+        with open_sink(output_mode, output_path) if combined and not direct else nullcontext() as archive:
+            for n, chunk_result in completed():
+                index, first, _ = chunks[n]
+                file = files[index]
+                file["chunks"][first] = chunk_result
+                file["left"] -= 1
+                if file["left"]:
+                    continue
+
+                results = [file["chunks"][first] for first in sorted(file["chunks"])]
+                failed = next((r for r in results if not r["success"]), None)
+                result = {"success": failed is None, "input": file["path"], "page_count": file["pages"]}
+                if failed:
+                    result["error"] = failed["error"]
+                else:
+                    folders = [chunk_target(index, first) for first in sorted(file["chunks"])]
+                    if direct:
+                        result["output"] = folders[0]
+                        result["images"] = len(_folder_entries(folders[0]))
+                    else:
+                        if combined:
+                            sink, prefix = nullcontext(archive), file["name"] + "/"
+                            result["output"] = prefix
+                        else:
+                            result["output"] = os.path.join(output_path, file["name"] + ".zip")
+                            sink, prefix = open_sink("zip", result["output"]), ""
+                        images = 0
+                        with sink as target:
+                            for folder in folders:
+                                for entry_name in _folder_entries(folder):
+                                    with open(os.path.join(folder, *entry_name.split("/")), "rb") as f:
+                                        target.add(prefix + entry_name, f.read())
+                                    images += 1
+                        result["images"] = images
+                    summary["pages"] += file["pages"]
+                if not direct:
+                    for first in file["chunks"]:
+                        shutil.rmtree(chunk_target(index, first), ignore_errors=True)
+                file["chunks"] = None
+                report(result)
+
+        for file in files:
+            if file["pages"] == 0:
+                report({"success": True, "input": file["path"], "page_count": 0, "images": 0})
+
+    except Exception as e:
+        return {"success": False, "error": str(e), **summary}
+
+    finally:
+        if pool:
+            pool.shutdown(wait=True, cancel_futures=True)
+        if scratch:
+            scratch.close()
+        documents.close()
+
+    summary["memory"] = budget.stats()
+    if scratch:
+        summary["scratch"] = scratch.stats()
+    summary["elapsed_s"] = round(time.perf_counter() - start, 3)
+    if summary["failed"]:
+        return {"success": False, "error": f"{summary['failed']} of {summary['files']} files failed", **summary}
+    return {"success": True, **summary}
+
 
 def main():
     parser = argparse.ArgumentParser(description="Convert PDF pages to images and zip them.")
-    parser.add_argument("input", help="Path to input PDF file")
-    parser.add_argument("output", help="Path to output ZIP file")
+    parser.add_argument("input", nargs="+",
+                        help="Path to input PDF file; several files, glob patterns or folders convert them all in one run")
+    parser.add_argument("output", help="Path to output ZIP file (directory with --output-mode dir, '-' for stdout streams); "
+                                       "with several inputs, a folder for one ZIP per input unless --combined")
+    parser.add_argument("--combined", action="store_true",
+                        help="With several inputs, write one archive with a folder per input")
+    parser.add_argument("--processes", type=int,
+                        help="With several inputs, worker processes (default: CPU count)")
+    parser.add_argument("--output-mode", type=str, default="zip", choices=SINK_MODES,
+                        help="zip file, plain directory, or ZIP/tar streamed to a pipe or stdout")
     parser.add_argument("--dpi", type=int, default=150, help="DPI for image quality (72,150,300)")
-    parser.add_argument("--format", type=str, default="jpg", help="Image format: jpg or png")
+    parser.add_argument("--format", type=str, default="jpg",
+                        help="Image format: jpg, png or auto (per page: grayscale/1-bit PNG for line art, JPEG for photos)")
+    parser.add_argument("--compare-fixed", action="store_true",
+                        help="With --format auto, also report bytes and encode time saved versus fixed JPEG settings")
+    parser.add_argument("--sizes", type=str,
+                        help="Render each page once and emit several sizes, e.g. '300,150,72,w256' (w = pixel width)")
+    parser.add_argument("--workers", type=int,
+                        help="Encoder threads (default: based on CPU count, 0 = no pipelining)")
+    parser.add_argument("--queue-depth", type=int,
+                        help="Max rendered pages held in memory while encoding (default: 2 x workers)")
+    parser.add_argument("--memory-budget", type=int,
+                        help="MB of page data held in memory at once (default: half the available memory)")
+    parser.add_argument("--scratch-quota", type=int,
+                        help="With several inputs, MB of staged images before new files wait (default: none on disk, "
+                             "a quarter of the free space on a tmpfs)")
+    parser.add_argument("--job-id", type=str,
+                        help="Make the run resumable: rerunning with the same ID skips pages already done")
     parser.add_argument("--include-page-numbers", action="store_true", help="Include page numbers in filenames")
     parser.add_argument("--json", action="store_true", help="Return JSON result for .NET backend")
 
     args = parser.parse_args()
 
+    if args.output == "-":
+        # Keep stray prints and library warnings out of the image stream
+        claim_stdout()
+
+    # When the images go to stdout, the report has to go to stderr
+    report = sys.stderr if args.output == "-" else sys.stdout
+
+    memory_budget = args.memory_budget * 1024 * 1024 if args.memory_budget else None
+
+    if is_multi_input(args.input):
+        # One JSON line per file as it finishes, then the summary line
+        def on_result(file_result):
+            if args.json:
+                print(json.dumps(file_result), file=report, flush=True)
+            elif file_result["success"]:
+                print(f"✅ {file_result['input']}: {file_result['page_count']} pages", file=report, flush=True)
+            else:
+                print(f"❌ {file_result['input']}: {file_result['error']}", file=report, flush=True)
+
+        inputs = expand_inputs(args.input)
+        if args.job_id:
+            result = {"success": False, "error": "--job-id works with a single input only"}
+        elif not inputs:
+            result = {"success": False, "error": "No input files found"}
+        else:
+            result = convert_many(inputs, args.output, combined=args.combined, output_mode=args.output_mode,
+                                  processes=args.processes, on_result=on_result, dpi=args.dpi, fmt=args.format,
+                                  include_page_numbers=args.include_page_numbers, sizes=args.sizes,
+                                  compare_fixed=args.compare_fixed, memory_budget=memory_budget,
+                                  scratch_quota=args.scratch_quota * 1024 * 1024 if args.scratch_quota else None)
+        if args.json:
+            print(json.dumps(result), file=report)
+        elif result["success"]:
+            print(f"✅ Converted {result['files']} files, {result['pages']} pages → {args.format.upper()} "
+                  f"(DPI={args.dpi})", file=report)
+        else:
+            print(f"❌ Error: {result['error']}", file=report)
+        return
+
     result = convert_pdf_to_images(
-        input_path=args.input,
+        input_path=args.input[0],
         output_path=args.output,
         dpi=args.dpi,
         fmt=args.format,
         include_page_numbers=args.include_page_numbers,
+        sizes=args.sizes,
+        compare_fixed=args.compare_fixed,
+        output_mode=args.output_mode,
+        workers=args.workers,
+        queue_depth=args.queue_depth,
+        job_id=args.job_id,
+        memory_budget=memory_budget,
     )
 
     if args.json:
-        print(json.dumps(result))
+        print(json.dumps(result), file=report)
     else:
         if result["success"]:
-            print(f"✅ Converted {result['page_count']} pages → {result['format'].upper()} (DPI={result['dpi']})")
+            print(f"✅ Converted {result['page_count']} pages → {result['format'].upper()} (DPI={result['dpi']})", file=report)
         else:
-            print(f"❌ Error: {result['error']}")
+            print(f"❌ Error: {result['error']}", file=report)
 
 
 if __name__ == "__main__":
+    if getattr(sys, "frozen", False):
+        # Lets the worker processes of multi-input runs start in frozen builds
+        # (a no-op otherwise, so plain runs skip the import)
+        import multiprocessing
+
+        multiprocessing.freeze_support()
     main()
@@ -16,15 +16,22 @@
 ##
 
 
-import fitz  # PyMuPDF
+import io
 import json
+import re
 import sys
 import os
-from PIL import Image
-import io
-import base64
 
-def extract_images_from_pdf(pdf_path, pages=None, page_ranges=None, mode="extract"):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from pdf_common.doc_loader import open_document
+from pdf_common.frames import RESULT_CHANNELS, open_channel, write_framed
+from pdf_common.journal import JobJournal
+from pdf_common.pipeline import run_pipeline
+from pdf_common.scheduler import MemoryBudget, estimate_image_cost, size_pool
+
+def extract_images_from_pdf(pdf_path, pages=None, page_ranges=None, mode="extract", workers=None, queue_depth=None,
+                            job_id=None, memory_budget=None, binary=False):
     """
     Extract or analyze images from PDF pages
     
@@ -32,57 +39,73 @@ def extract_images_from_pdf(pdf_path, pages=None, page_ranges=None, mode="extrac
         pdf_path: Path to PDF file
         pages: List of specific page numbers (1-based)
         page_ranges: List of page ranges like ["1-3", "5-7"]
-        mode: "extract" or "remove"
+        mode: "extract", "remove" or "analyze" (metadata only, no image is decoded)
+        workers: Encoder threads for extract mode (None = by CPU count, 0 = serial)
+        queue_depth: Max decoded images held in memory while encoding
+        job_id: Makes extract mode resumable; a rerun with the same ID skips finished pages
+        memory_budget: Bytes of decoded images held at once (None = half the available memory)
+        binary: Return image and PDF data as bytes (for a framed result) instead of base64 strings
     
     Returns:
         Dictionary with results
     """
     try:
-        doc = fitz.open(pdf_path)
-        total_pages = doc.page_count
-        
-        # Determine pages to process
-        pages_to_process = set()
-        
-        # If no pages specified, process all pages
-        if not pages and not page_ranges:
-            pages_to_process = set(range(total_pages))
-        else:
-            # Add specific pages
-            if pages:
-                for page_num in pages:
-                    if 1 <= page_num <= total_pages:
-                        pages_to_process.add(page_num - 1)  # Convert to 0-based
+        with open_document(pdf_path) as doc:
+            total_pages = doc.page_count
+            
+            # Determine pages to process
+            pages_to_process = set()
             
-            # Add page ranges
-            if page_ranges:
-                for range_str in page_ranges:
-                    if '-' in range_str:
-                        start_str, end_str = range_str.split('-', 1)
-                        try:
-                            start = int(start_str.strip())
-                            end = int(end_str.strip())
-                            for page_num in range(start, end + 1):
+            # If no pages specified, process all pages
+            if not pages and not page_ranges:
+                pages_to_process = set(range(total_pages))
+            else:
+                # Add specific pages
+                if pages:
+                    for page_num in pages:
+                        if 1 <= page_num <= total_pages:
+                            pages_to_process.add(page_num - 1)  # Convert to 0-based
+                
+                # Add page ranges
+                if page_ranges:
+                    for range_str in page_ranges:
+                        if '-' in range_str:
+                            start_str, end_str = range_str.split('-', 1)
+                            try:
+                                start = int(start_str.strip())
+                                end = int(end_str.strip())
+                                for page_num in range(start, end + 1):
+                                    if 1 <= page_num <= total_pages:
+                                        pages_to_process.add(page_num - 1)
+                            except ValueError:
+                                continue
+                        else:
+                            # Single page in range format
+                            try:
+                                page_num = int(range_str.strip())
                                 if 1 <= page_num <= total_pages:
                                     pages_to_process.add(page_num - 1)
-                        except ValueError:
-                            continue
-                    else:
-                        # Single page in range format
-                        try:
-                            page_num = int(range_str.strip())
-                            if 1 <= page_num <= total_pages:
-                                pages_to_process.add(page_num - 1)
-                        except ValueError:
-                            continue
-        
-        pages_to_process = sorted(pages_to_process)
-        
-        if mode == "extract":
-            return extract_images(doc, pages_to_process)
-        else:  # remove mode
-            return remove_images(doc, pages_to_process, pdf_path)
+                            except ValueError:
+                                continue
             
+            pages_to_process = sorted(pages_to_process)
+            
+            if mode == "extract":
+                journal = None
+                if job_id:
+                    journal = JobJournal(job_id, pdf_path, {"mode": mode, "pages": pages_to_process})
+                try:
+                    return extract_images(doc, pages_to_process, workers, queue_depth, journal, memory_budget,
+                                          binary)
+                finally:
+                    # An unfinished job keeps its directory so a retry can resume it
+                    if journal:
+                        journal.close()
+            elif mode == "analyze":
+                return analyze_images(doc, pages_to_process)
+            else:  # remove mode
+                return remove_images(doc, pages_to_process, pdf_path, binary)
+
     except Exception as e:
         return {
             "success": False,
@@ -90,54 +113,219 @@ def extract_images_from_pdf(pdf_path, pages=None, page_ranges=None, mode="extrac
             "extracted_count": 0,
             "processed_pages": 0
         }
-    finally:
-        if 'doc' in locals():
-            doc.close()
 
-def extract_images(doc, pages_to_process):
-    """Extract images from specified pages"""
+# Pillow modes for the pixmap layouts (components, alpha) that can be saved as PNG
+PNG_MODES = {(1, 0): "L", (3, 0): "RGB", (2, 1): "LA", (4, 1): "RGBA"}
+PNG_COMPRESS_LEVEL = 1  # as fast as MuPDF's own PNG writer, and smaller output
+
+def extract_images(doc, pages_to_process, workers=None, queue_depth=None, journal=None, memory_budget=None,
+                   binary=False):
+    """
+    Extract images from specified pages; with a journal, pages it lists as done are skipped.
+    Images are only decoded while their estimated size fits memory_budget (see pdf_common.scheduler).
+    With binary, each image's "data" is the PNG bytes rather than base64 text.
+    """
+    import base64
+    import fitz  # PyMuPDF
+    from PIL import Image
+
     all_images = []
-    total_images = 0
-    
-    for page_index in pages_to_process:
-        page = doc[page_index]
-        image_list = page.get_images()
-        
-        for img_index, img in enumerate(image_list):
-            try:
+    budget = MemoryBudget(memory_budget)
+    pending_pages = [page_index for page_index in pages_to_process if not (journal and journal.is_done(page_index))]
+    costs = {}
+    for page_index in pending_pages:
+        for img in doc[page_index].get_images():
+            costs[img[0]] = estimate_image_cost(img[2], img[3], img[5], img[1])
+    workers, queue_depth = size_pool(list(costs.values()), budget, workers, queue_depth)
+
+    def decode_images():
+        # Decode stage: the only thread that touches the document
+        for page_index in pending_pages:
+            page = doc[page_index]
+            image_list = page.get_images()
+
+            for img_index, img in enumerate(image_list):
                 xref = img[0]
-                pix = fitz.Pixmap(doc, xref)
-                
-                # Convert to RGB if needed
-                if pix.n - pix.alpha < 4:  # can be saved as PNG
-                    img_data = pix.tobytes("png")
-                    
-                    image_info = {
-                        "page": page_index + 1,
-                        "index": img_index,
-                        "width": pix.width,
-                        "height": pix.height,
-                        "format": "png",
-                        "data": base64.b64encode(img_data).decode('ascii')
-                    }
-                    all_images.append(image_info)
-                    total_images += 1
-                
-                pix = None  # Free pixmap memory
-                
-            except Exception as e:
-                print(f"Warning: Failed to extract image {img_index} from page {page_index + 1}: {e}", file=sys.stderr)
-                continue
-    
+                budget.acquire(costs[xref])
+                try:
+                    pix = fitz.Pixmap(doc, xref)
+
+                    # Convert to RGB if needed
+                    if pix.n - pix.alpha < 4:  # can be saved as PNG
+                        mode = PNG_MODES.get((pix.n, pix.alpha))
+                        if mode:
+                            image = Image.frombytes(mode, [pix.width, pix.height], pix.samples)
+                        else:
+                            # Unusual layout: let MuPDF write it, here in the decode thread
+                            image = pix.tobytes("png")
+                        yield page_index, img_index, pix.width, pix.height, image, costs[xref]
+                        image = None
+                    else:
+                        budget.release(costs[xref])
+
+                    pix = None  # Free pixmap memory
+
+                except Exception as e:
+                    budget.release(costs[xref])
+                    print(f"Warning: Failed to extract image {img_index} from page {page_index + 1}: {e}", file=sys.stderr)
+                    continue
+
+    def encode_image(decoded):
+        page_index, img_index, width, height, image, cost = decoded
+        try:
+            if isinstance(image, bytes):
+                img_data = image
+            else:
+                buffer = io.BytesIO()
+                image.save(buffer, "PNG", compress_level=PNG_COMPRESS_LEVEL)
+                img_data = buffer.getvalue()
+        except Exception as e:
+            print(f"Warning: Failed to extract image {img_index} from page {page_index + 1}: {e}", file=sys.stderr)
+            return None
+        finally:
+            # The decoded pixels are dropped once encoded
+            image = decoded = None
+            budget.release(cost)
+
+        return {
+            "page": page_index + 1,
+            "index": img_index,
+            "width": width,
+            "height": height,
+            "format": "png",
+            "data": img_data if binary else base64.b64encode(img_data).decode('ascii')
+        }
+
+    page_images = []
+
+    def finish_page():
+        # Images arrive in page order, so a page is complete once the next one starts
+        if journal and page_images:
+            page_index = page_images[0]["page"] - 1
+            entry_name = f"page_{page_index + 1:05d}.json"
+            # Staged pages are JSON, so their data is always base64
+            staged = [dict(info, data=base64.b64encode(info["data"]).decode('ascii')) for info in page_images] \
+                if binary else page_images
+            journal.staging.add(entry_name, json.dumps(staged).encode("utf-8"))
+            journal.complete(page_index, [entry_name])
+        all_images.extend(page_images)
+        page_images.clear()
+
+    def collect(image_info):
+        if image_info is None:
+            return
+        if page_images and page_images[0]["page"] != image_info["page"]:
+            finish_page()
+        page_images.append(image_info)
+
+    pipeline_stats = run_pipeline(decode_images(), encode_image, collect, workers=workers, queue_depth=queue_depth)
+    finish_page()
+
+    if journal:
+        # Pages finished by an earlier run come from the staged files
+        all_images = [image_info for entry_name in journal.entries()
+                      for image_info in json.loads(journal.read(entry_name))]
+        if binary:
+            for image_info in all_images:
+                image_info["data"] = base64.b64decode(image_info["data"])
+        resumed_pages = journal.resumed_pages
+        journal.finish()
+
+    result = {
+        "success": True,
+        "extracted_count": len(all_images),
+        "processed_pages": len(pages_to_process),
+        "images": all_images,
+        "pipeline": pipeline_stats,
+        "memory": budget.stats()
+    }
+    if journal:
+        result["job"] = {"id": journal.job_id, "resumed_pages": resumed_pages}
+    return result
+
+# Filter of an image stream -> format of its encoded data
+IMAGE_FILTER_FORMATS = {"DCTDecode": "jpeg", "JPXDecode": "jpx", "JBIG2Decode": "jbig2", "CCITTFaxDecode": "ccitt",
+                        "FlateDecode": "flate", "LZWDecode": "lzw", "RunLengthDecode": "rle"}
+
+def _colorspace_components(doc, xref, colorspace):
+    """Color components of an image, reading /N of an ICC profile without touching any image data"""
+    name = (colorspace or "").lower()
+    if "gray" in name:
+        return 1
+    if "rgb" in name:
+        return 3
+    if "cmyk" in name:
+        return 4
+    if name == "iccbased":
+        kind, value = doc.xref_get_key(xref, "ColorSpace")
+        if kind == "xref":
+            value = doc.xref_object(int(value.split()[0]), compressed=True)
+        match = re.search(r"/ICCBased\s+(\d+)\s+0\s+R", value)
+        if match:
+            kind, n = doc.xref_get_key(int(match.group(1)), "N")
+            if kind == "int":
+                return int(n)
+    return None
+
+def _stream_length(doc, xref):
+    """Compressed size of a stream from its /Length entry"""
+    kind, value = doc.xref_get_key(xref, "Length")
+    if kind == "xref":
+        kind, value = "int", doc.xref_object(int(value.split()[0]), compressed=True)
+    try:
+        return int(value)
+    except ValueError:
+        return len(doc.xref_stream_raw(xref))
+
+def analyze_images(doc, pages_to_process):
+    """
+    Inventory the images of the specified pages from the image dictionaries
+    alone: nothing is decoded, so this stays fast on large image-heavy files.
+    Each image (xref) is listed once with the pages that use it.
+    """
+    images = {}
+    placements = 0
+
+    for page_index in pages_to_process:
+        for img in doc[page_index].get_images(full=True):
+            xref, smask, width, height, bpc, colorspace, alt_colorspace, _, image_filter, _ = img
+            placements += 1
+            info = images.get(xref)
+            if info is None:
+                components = _colorspace_components(doc, xref, colorspace)
+                info = images[xref] = {
+                    "xref": xref,
+                    "width": width,
+                    "height": height,
+                    "bits_per_component": bpc,
+                    "colorspace": colorspace,
+                    "alt_colorspace": alt_colorspace or None,
+                    "components": components,
+                    "filter": image_filter or None,
+                    "format": IMAGE_FILTER_FORMATS.get(image_filter, "raw" if not image_filter else image_filter.lower()),
+                    "compressed_bytes": _stream_length(doc, xref),
+                    "decoded_bytes": width * height * components * bpc // 8 if components else None,
+                    "smask": smask or None,
+                    "pages": [],
+                }
+            if not info["pages"] or info["pages"][-1] != page_index + 1:
+                info["pages"].append(page_index + 1)
+
     return {
         "success": True,
-        "extracted_count": total_images,
+        "mode": "analyze",
         "processed_pages": len(pages_to_process),
-        "images": all_images
+        "image_count": len(images),
+        "placements": placements,
+        "compressed_bytes": sum(info["compressed_bytes"] for info in images.values()),
+        "images": list(images.values())
     }
 
-def remove_images(doc, pages_to_process, original_path):
-    """Remove images from specified pages and return modified PDF"""
+def remove_images(doc, pages_to_process, original_path, binary=False):
+    """Remove images from specified pages and return modified PDF (as bytes with binary, else base64)"""
+    import base64
+    import fitz  # PyMuPDF
+
     try:
         # Create a new document
         new_doc = fitz.open()
@@ -180,7 +368,7 @@ def remove_images(doc, pages_to_process, original_path):
         return {
             "success": True,
             "processed_pages": len(pages_to_process),
-            "pdf_data": base64.b64encode(pdf_data).decode('ascii'),
+            "pdf_data": pdf_data if binary else base64.b64encode(pdf_data).decode('ascii'),
             "removed_images_count": images_removed_count
         }
         
@@ -194,12 +382,20 @@ def remove_images(doc, pages_to_process, original_path):
             "processed_pages": 0
         }
 
+def write_result(result, stream=None):
+    """Report a result: JSON on stdout, or one framed binary result (see pdf_common.frames) on an open channel"""
+    if stream is None:
+        print(json.dumps(result))
+    else:
+        write_framed(stream, result)
+
 def main():
     if len(sys.argv) < 2:
         error_result = {"success": False, "error": "No arguments provided"}
         print(json.dumps(error_result))
         sys.exit(1)
     
+    channel = None
     try:
         # Read JSON from file (first argument is file path)
         json_file_path = sys.argv[1]
@@ -211,14 +407,35 @@ def main():
         pages = request.get("pages")
         page_ranges = request.get("page_ranges")
         mode = request.get("mode", "extract")
+        workers = request.get("workers")
+        queue_depth = request.get("queue_depth")
+        job_id = request.get("job_id")
+        memory_budget_mb = request.get("memory_budget_mb")
+        
+        # "framed" sends image/PDF bytes raw instead of base64 in the JSON
+        result_channel = request.get("result_channel", "json")
+        if result_channel not in RESULT_CHANNELS:
+            write_result({"success": False, "error": f"Unsupported result channel: {result_channel}"})
+            sys.exit(1)
+        if result_channel == "framed":
+            # Opened before any work: a pipe that isn't there is reported
+            # right away. On stdout this also keeps stray prints out of the stream.
+            pipe = request.get("result_pipe")
+            try:
+                channel = open_channel(pipe)
+            except OSError as e:
+                print(json.dumps({"success": False, "error": f"Cannot open result pipe {pipe}: {str(e)}"}))
+                sys.exit(1)
         
         if not pdf_path or not os.path.exists(pdf_path):
             error_result = {"success": False, "error": f"PDF file not found: {pdf_path}"}
-            print(json.dumps(error_result))
+            write_result(error_result, channel)
             sys.exit(1)
         
-        result = extract_images_from_pdf(pdf_path, pages, page_ranges, mode)
-        print(json.dumps(result))
+        memory_budget = memory_budget_mb * 1024 * 1024 if memory_budget_mb else None
+        result = extract_images_from_pdf(pdf_path, pages, page_ranges, mode, workers, queue_depth, job_id,
+                                         memory_budget, binary=channel is not None)
+        write_result(result, channel)
         
     except json.JSONDecodeError as e:
         error_result = {"success": False, "error": f"Invalid JSON input: {str(e)}"}
@@ -226,8 +443,18 @@ def main():
         sys.exit(1)
     except Exception as e:
         error_result = {"success": False, "error": f"Processing error: {str(e)}"}
-        print(json.dumps(error_result))
+        try:
+            write_result(error_result, channel)
+        except Exception:
+            # The channel itself failed (reader gone): fall back to plain JSON
+            print(json.dumps(error_result))
         sys.exit(1)
+    finally:
+        if channel is not None:
+            try:
+                channel.close()
+            except OSError:
+                pass
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
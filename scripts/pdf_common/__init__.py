@@ -0,0 +1,25 @@
+##
+ # LocalPDF Studio - Offline PDF Toolkit
+ # ======================================
+ #
+ # @author      Md. Alinur Hossain <alinur1160@gmail.com>
+ # @license     AGPL 3.0 (GNU Affero General Public License version 3)
+ # @website     https://alinur1.github.io/LocalPDF_Studio_Website/
+ # @repository  https://github.com/Alinur1/LocalPDF_Studio
+ #
+ # Copyright (c) 2025 Md. Alinur Hossain. All rights reserved.
+ #
+ # Architecture:
+ # - Frontend: Electron + HTML/CSS/JS
+ # - Backend: ASP.NET Core Web API, Python
+ # - PDF Engine: PdfSharp + Mozilla PDF.js
+##
+
+"""
+Helpers shared by the Python tool scripts.
+
+The scripts put their parent directory on sys.path to import this package.
+When building the executables, pass `--paths ..` to PyInstaller so it is
+bundled. Modules here must stay cheap to import: PyMuPDF and Pillow are
+only imported inside the functions that need them.
+"""
@@ -0,0 +1,163 @@
+##
+ # LocalPDF Studio - Offline PDF Toolkit
+ # ======================================
+ #
+ # @author      Md. Alinur Hossain <alinur1160@gmail.com>
+ # @license     AGPL 3.0 (GNU Affero General Public License version 3)
+ # @website     https://alinur1.github.io/LocalPDF_Studio_Website/
+ # @repository  https://github.com/Alinur1/LocalPDF_Studio
+ #
+ # Copyright (c) 2025 Md. Alinur Hossain. All rights reserved.
+ #
+ # Architecture:
+ # - Frontend: Electron + HTML/CSS/JS
+ # - Backend: ASP.NET Core Web API, Python
+ # - PDF Engine: PdfSharp + Mozilla PDF.js
+##
+
+"""
+Document loading shared by the tool scripts.
+
+A one-shot script run simply opens the file. A long-lived process (batch
+mode, benchmarks, a future daemon) can call enable_cache() so that repeated
+jobs on the same input reuse one parsed document instead of re-reading the
+file and re-parsing its xref every time. Cache entries are keyed by
+(path, mtime, size), so a file that changed on disk is never served stale.
+"""
+
+import contextlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+
+_cache = None
+
+
+def open_pdf(path, use_mmap=False):
+    """
+    Open a PDF, optionally from a read-only memory map of the file.
+
+    The mapping is handed to MuPDF as a memoryview, so the bytes are not
+    copied; the document keeps the view alive for as long as it is open.
+    """
+    import fitz  # PyMuPDF
+
+    if not use_mmap:
+        return fitz.open(path)
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap cannot map empty files; let MuPDF report the usual error
+            return fitz.open(path)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return fitz.open(stream=memoryview(mapped), filetype="pdf")
+
+
+def _file_key(path):
+    stat = os.stat(path)
+    return os.path.realpath(path), stat.st_mtime_ns, stat.st_size
+
+
+class DocumentCache:
+    """
+    LRU cache of parsed documents for read-only use.
+
+    Documents handed out by get() are shared: callers must not modify or
+    close them, and must not use one document from several threads at once.
+    With use_mmap, inputs should be replaced (write + rename) rather than
+    rewritten in place while a cached document is still being read.
+    """
+
+    def __init__(self, max_entries=8, use_mmap=True):
+        self.max_entries = max(1, max_entries)
+        self.use_mmap = use_mmap
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # realpath -> (key, document)
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        key = _file_key(path)
+        real_path = key[0]
+        with self._lock:
+            entry = self._entries.get(real_path)
+            if entry and entry[0] == key and not entry[1].is_closed:
+                self._entries.move_to_end(real_path)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                # The file changed on disk since it was cached
+                self._close_entry(real_path)
+
+            self.misses += 1
+            doc = open_pdf(path, use_mmap=self.use_mmap)
+            self._entries[real_path] = (key, doc)
+            while len(self._entries) > self.max_entries:
+                self._close_entry(next(iter(self._entries)))
+            return doc
+
+    def clear(self):
+        with self._lock:
+            for real_path in list(self._entries):
+                self._close_entry(real_path)
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _close_entry(self, real_path):
+        _, doc = self._entries.pop(real_path)
+        if not doc.is_closed:
+            doc.close()
+
+
+def enable_cache(max_entries=8, use_mmap=True):
+    """Turn on process-wide document caching; returns the cache"""
+    global _cache
+    if _cache is None:
+        _cache = DocumentCache(max_entries, use_mmap)
+    return _cache
+
+
+def disable_cache():
+    global _cache
+    if _cache is not None:
+        _cache.clear()
+        _cache = None
+
+
+@contextlib.contextmanager
+def cached_documents(max_entries=8, use_mmap=True):
+    """
+    Context manager enabling the cache for one job; yields the cache. A
+    cache that was already enabled is left as it is, one enabled here is
+    disabled (and its documents closed) on exit.
+    """
+    owned = _cache is None
+    cache = enable_cache(max_entries, use_mmap)
+    try:
+        yield cache
+    finally:
+        if owned:
+            disable_cache()
+
+
+@contextlib.contextmanager
+def open_document(path, readonly=True):
+    """
+    Context manager yielding an open document for path.
+
+    With the cache enabled, read-only callers get the shared cached document
+    (left open on exit). Callers that modify the document always get a
+    private copy, opened from a memory map when the cache is on, which is
+    closed on exit.
+    """
+    if _cache is not None and readonly:
+        yield _cache.get(path)
+        return
+
+    doc = open_pdf(path, use_mmap=_cache is not None and _cache.use_mmap)
+    try:
+        yield doc
+    finally:
+        doc.close()
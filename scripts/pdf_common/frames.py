@@ -0,0 +1,116 @@
+##
+ # LocalPDF Studio - Offline PDF Toolkit
+ # ======================================
+ #
+ # @author      Md. Alinur Hossain <alinur1160@gmail.com>
+ # @license     AGPL 3.0 (GNU Affero General Public License version 3)
+ # @website     https://alinur1.github.io/LocalPDF_Studio_Website/
+ # @repository  https://github.com/Alinur1/LocalPDF_Studio
+ #
+ # Copyright (c) 2025 Md. Alinur Hossain. All rights reserved.
+ #
+ # Architecture:
+ # - Frontend: Electron + HTML/CSS/JS
+ # - Backend: ASP.NET Core Web API, Python
+ # - PDF Engine: PdfSharp + Mozilla PDF.js
+##
+
+"""
+Framed binary results: a JSON header followed by raw byte segments.
+
+Printing a result with json.dumps forces every binary payload through
+base64 (a third larger, and encoded/decoded as one big string on both
+sides). A framed result keeps the JSON for the structure and sends the
+bytes as they are:
+
+    magic       4 bytes   b"LPDF"
+    version     1 byte    FRAME_VERSION
+    header_len  4 bytes   big-endian unsigned
+    header      UTF-8 JSON {"result": ..., "segments": [length, ...]}
+    segments    the raw bytes of every segment, back to back
+
+Inside "result" every bytes value is replaced by {"$segment": n}, the
+index of its segment. The reader takes the header, then reads exactly the
+listed lengths; nothing is base64-encoded and nothing is joined into one
+buffer on the way out.
+"""
+
+import json
+import os
+import struct
+
+FRAME_MAGIC = b"LPDF"
+FRAME_VERSION = 1
+RESULT_CHANNELS = ["json", "framed"]
+
+_PREFIX = struct.Struct(">4sBI")
+
+
+def _split_segments(value, segments):
+    """Copy of value with every bytes object moved to segments"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        segments.append(value)
+        return {"$segment": len(segments) - 1}
+    if isinstance(value, dict):
+        return {key: _split_segments(item, segments) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_split_segments(item, segments) for item in value]
+    return value
+
+
+def write_framed(stream, result):
+    """Write result to a binary stream as one frame; returns the bytes written"""
+    segments = []
+    header = json.dumps({"result": _split_segments(result, segments),
+                         "segments": [len(segment) for segment in segments]}).encode("utf-8")
+    stream.write(_PREFIX.pack(FRAME_MAGIC, FRAME_VERSION, len(header)))
+    stream.write(header)
+    written = _PREFIX.size + len(header)
+    for segment in segments:
+        stream.write(segment)
+        written += len(segment)
+    stream.flush()
+    return written
+
+
+def _read_exactly(stream, size):
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated frame")
+    return data
+
+
+def _join_segments(value, segments):
+    if isinstance(value, dict):
+        if len(value) == 1 and "$segment" in value:
+            return segments[value["$segment"]]
+        return {key: _join_segments(item, segments) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_join_segments(item, segments) for item in value]
+    return value
+
+
+def read_framed(stream):
+    """Read one frame written by write_framed and return the result with its bytes restored"""
+    magic, version, header_len = _PREFIX.unpack(_read_exactly(stream, _PREFIX.size))
+    if magic != FRAME_MAGIC:
+        raise ValueError("Not a framed result")
+    if version != FRAME_VERSION:
+        raise ValueError(f"Unsupported frame version {version}")
+    header = json.loads(_read_exactly(stream, header_len).decode("utf-8"))
+    segments = [_read_exactly(stream, length) for length in header["segments"]]
+    return _join_segments(header["result"], segments)
+
+
+def open_channel(target=None):
+    """
+    Binary stream for a framed result: stdout when target is None or "-",
+    otherwise a path such as a named pipe (\\\\.\\pipe\\<name> on Windows, a
+    FIFO elsewhere) that the reader has already created. A missing target
+    raises OSError rather than being created as a plain file.
+    """
+    if target in (None, "-"):
+        from pdf_common.sinks import claim_stdout
+
+        return claim_stdout()
+    return os.fdopen(os.open(target, os.O_WRONLY | getattr(os, "O_BINARY", 0)), "wb")
@@ -0,0 +1,180 @@
+##
+ # LocalPDF Studio - Offline PDF Toolkit
+ # ======================================
+ #
+ # @author      Md. Alinur Hossain <alinur1160@gmail.com>
+ # @license     AGPL 3.0 (GNU Affero General Public License version 3)
+ # @website     https://alinur1.github.io/LocalPDF_Studio_Website/
+ # @repository  https://github.com/Alinur1/LocalPDF_Studio
+ #
+ # Copyright (c) 2025 Md. Alinur Hossain. All rights reserved.
+ #
+ # Architecture:
+ # - Frontend: Electron + HTML/CSS/JS
+ # - Backend: ASP.NET Core Web API, Python
+ # - PDF Engine: PdfSharp + Mozilla PDF.js
+##
+
+"""
+Resumable jobs for long page-by-page runs.
+
+A job with an ID gets a work directory <root>/<job id>/ holding the output
+entries of every finished page ("staged/") and an append-only journal
+listing which pages are done. A run that dies (out of memory, killed by
+the backend) leaves both behind; running the same job again skips the
+finished pages, then the caller copies the staged entries into the real
+output and finish() removes the work directory.
+
+The journal starts with a header recording the input file and the job
+parameters. If either differs on restart the old work is discarded, so a
+job ID reused for a different input never mixes outputs. Work directories
+not touched for JOB_MAX_AGE_S are removed whenever a job is opened.
+
+One job ID must not be run by two processes at the same time.
+"""
+
+import json
+import os
+import re
+import shutil
+import time
+
+from pdf_common.sinks import DirectorySink
+
+JOB_MAX_AGE_S = 2 * 24 * 3600
+JOURNAL_NAME = "journal.jsonl"
+
+_JOB_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+def default_root():
+    import tempfile
+
+    return os.path.join(tempfile.gettempdir(), "localpdf_jobs")
+
+
+def cleanup_stale_jobs(root=None, max_age_s=JOB_MAX_AGE_S, keep=None):
+    """Remove job directories untouched for max_age_s seconds; returns how many were removed"""
+    root = root or default_root()
+    if not os.path.isdir(root):
+        return 0
+    cutoff = time.time() - max_age_s
+    removed = 0
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name == keep or not os.path.isdir(path):
+            continue
+        journal = os.path.join(path, JOURNAL_NAME)
+        try:
+            modified = os.path.getmtime(journal if os.path.exists(journal) else path)
+        except OSError:
+            continue
+        if modified < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+class JobJournal:
+    """
+    Journal of the pages a job has finished.
+
+        journal = JobJournal("job-42", input_path, {"dpi": 150})
+        if not journal.is_done(i):
+            journal.staging.add(name, data)
+            journal.complete(i, [name])
+        ...
+        for name in journal.entries(): final_sink.add(name, journal.read(name))
+        journal.finish()
+    """
+
+    def __init__(self, job_id, input_path, params, root=None):
+        if not job_id or not _JOB_ID.match(job_id):
+            raise ValueError(f"Invalid job ID: {job_id!r} (use letters, digits, '.', '_' or '-')")
+        root = root or default_root()
+        cleanup_stale_jobs(root, keep=job_id)
+
+        self.job_id = job_id
+        self.path = os.path.join(root, job_id)
+        self.staging_dir = os.path.join(self.path, "staged")
+        self._journal_path = os.path.join(self.path, JOURNAL_NAME)
+        stat = os.stat(input_path)
+        self.header = {
+            "job_id": job_id,
+            "input": [os.path.realpath(input_path), stat.st_mtime_ns, stat.st_size],
+            "params": params,
+        }
+        self.done = self._load()
+        self.resumed_pages = len(self.done)
+
+        self.staging = DirectorySink(self.staging_dir)
+        new_journal = not os.path.exists(self._journal_path)
+        self._file = open(self._journal_path, "a", encoding="utf-8")
+        if new_journal:
+            self._append(self.header)
+
+    def _load(self):
+        """Return {page: record} from an existing journal of the same job, else reset the work dir"""
+        done = {}
+        try:
+            with open(self._journal_path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            lines = []
+
+        if lines:
+            try:
+                header = json.loads(lines[0])
+            except ValueError:
+                header = None
+            if header != json.loads(json.dumps(self.header)):
+                lines = []
+            for line in lines[1:]:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # The last line may be cut off if the process died while writing it
+                    continue
+                done[record["page"]] = record
+
+        if not done and os.path.isdir(self.path):
+            shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
+        return done
+
+    def _append(self, record):
+        # Flushed, not fsynced: the OS keeps the data if the process is killed
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def is_done(self, page):
+        return page in self.done
+
+    def complete(self, page, entries, info=None):
+        """Record a page as finished; its entries must already be in the staging sink"""
+        record = {"page": page, "entries": list(entries)}
+        if info:
+            record["info"] = info
+        self._append(record)
+        self.done[page] = record
+
+    def records(self):
+        """Finished page records in page order"""
+        return [self.done[page] for page in sorted(self.done)]
+
+    def entries(self):
+        """Staged entry names in page order"""
+        return [name for record in self.records() for name in record["entries"]]
+
+    def read(self, name):
+        with open(os.path.join(self.staging_dir, *name.split("/")), "rb") as f:
+            return f.read()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def finish(self):
+        """The output is complete: drop the journal and staged entries"""
+        self.close()
+        shutil.rmtree(self.path, ignore_errors=True)
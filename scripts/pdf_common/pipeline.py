@@ -0,0 +1,125 @@
+##
+ # LocalPDF Studio - Offline PDF Toolkit
+ # ======================================
+ #
+ # @author      Md. Alinur Hossain <alinur1160@gmail.com>
+ # @license     AGPL 3.0 (GNU Affero General Public License version 3)
+ # @website     https://alinur1.github.io/LocalPDF_Studio_Website/
+ # @repository  https://github.com/Alinur1/LocalPDF_Studio
+ #
+ # Copyright (c) 2025 Md. Alinur Hossain. All rights reserved.
+ #
+ # Architecture:
+ # - Frontend: Electron + HTML/CSS/JS
+ # - Backend: ASP.NET Core Web API, Python
+ # - PDF Engine: PdfSharp + Mozilla PDF.js
+##
+
+"""
+Render -> encode -> write pipeline for tools that work page by page.
+
+Rendering runs in the calling thread (a PyMuPDF document must not be used
+from several threads), encoding runs on a small thread pool and a single
+writer thread consumes the encoded results in their original order.
+Pillow's encoders and zlib release the GIL while compressing, so encoding
+overlaps with MuPDF rendering on multi-core machines.
+
+At most queue_depth rendered items exist at any time: the renderer has to
+take a slot before producing the next item and the writer gives it back
+once the item is written. A slow writer therefore throttles the encoders
+and the renderer, and peak memory stays at queue_depth pages.
+"""
+
+import os
+import queue
+import threading
+
+MAX_DEFAULT_WORKERS = 4
+
+_DONE = object()
+
+
+def default_workers():
+    """Encoder threads to use when the caller doesn't say; 0 (serial) on a single CPU"""
+    cpus = os.cpu_count() or 1
+    if cpus < 2:
+        return 0
+    return min(MAX_DEFAULT_WORKERS, cpus - 1)
+
+
+def run_pipeline(items, encode, write, workers=None, queue_depth=None):
+    """
+    Pull items (typically rendered pages) from the items iterable in this
+    thread, run encode(item) on the worker pool and call write(result) for
+    each result in the original order.
+
+    workers=0 runs the same stages serially in this thread. queue_depth
+    defaults to twice the number of workers. The first exception raised by
+    any stage stops the pipeline and is re-raised here.
+
+    Returns {"workers", "queue_depth", "items", "max_in_flight"}.
+    """
+    if workers is None:
+        workers = default_workers()
+    stats = {"workers": max(0, workers), "queue_depth": 1, "items": 0, "max_in_flight": 0}
+
+    if workers <= 0:
+        for item in items:
+            stats["max_in_flight"] = 1
+            write(encode(item))
+            stats["items"] += 1
+        return stats
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    queue_depth = max(1, queue_depth or 2 * workers)
+    stats["queue_depth"] = queue_depth
+    slots = threading.BoundedSemaphore(queue_depth)
+    pending = queue.Queue(maxsize=queue_depth)
+    lock = threading.Lock()
+    failures = []
+    in_flight = [0]
+
+    def writer():
+        while True:
+            future = pending.get()
+            if future is _DONE:
+                return
+            try:
+                result = future.result()
+                if not failures:
+                    write(result)
+            except BaseException as e:
+                failures.append(e)
+            finally:
+                future = result = None
+                with lock:
+                    in_flight[0] -= 1
+                slots.release()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="encode") as pool:
+        writer_thread = threading.Thread(target=writer, name="writer", daemon=True)
+        writer_thread.start()
+        try:
+            iterator = iter(items)
+            while not failures:
+                slots.acquire()
+                if failures:
+                    break
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                with lock:
+                    in_flight[0] += 1
+                    stats["max_in_flight"] = max(stats["max_in_flight"], in_flight[0])
+                pending.put(pool.submit(encode, item))
+                item = None
+                stats["items"] += 1
+        finally:
+            pending.put(_DONE)
+            writer_thread.join()
+
+    if failures:
+        raise failures[0]
+    return stats
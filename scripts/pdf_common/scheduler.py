@@ -0,0 +1,204 @@
+##
+ # LocalPDF Studio - Offline PDF Toolkit
+ # ======================================
+ #
+ # @author      Md. Alinur Hossain <alinur1160@gmail.com>
+ # @license     AGPL 3.0 (GNU Affero General Public License version 3)
+ # @website     https://alinur1.github.io/LocalPDF_Studio_Website/
+ # @repository  https://github.com/Alinur1/LocalPDF_Studio
+ #
+ # Copyright (c) 2025 Md. Alinur Hossain. All rights reserved.
+ #
+ # Architecture:
+ # - Frontend: Electron + HTML/CSS/JS
+ # - Backend: ASP.NET Core Web API, Python
+ # - PDF Engine: PdfSharp + Mozilla PDF.js
+##
+
+"""
+Memory-aware admission for parallel page work.
+
+The memory a page needs is dominated by its pixel buffers and varies by
+orders of magnitude: an A4 page at 300 DPI renders to about 25 MB, an A0
+drawing at the same DPI to several GB, and a scanned page holds a decoded
+full-page image. estimate_page_cost() predicts those bytes up front from
+the page size, the DPI and the image dimensions listed by get_images(),
+without rendering or decoding anything.
+
+A MemoryBudget admits work while the estimated bytes in flight fit its
+limit, so small pages run with full concurrency and huge ones one at a
+time. A single item larger than the whole budget is still admitted, alone,
+once everything else has been released. size_pool() sizes the pipeline
+from the estimated costs, the budget and the CPU count.
+"""
+
+import os
+import sys
+import threading
+
+from pdf_common.pipeline import default_workers
+
+DEFAULT_BUDGET_FRACTION = 0.5   # share of the available memory used when no budget is given
+FALLBACK_BUDGET = 1 << 30       # when the available memory can't be determined
+PIXEL_COPIES = 2                # a MuPDF pixmap plus the Pillow image made from it
+
+
+def available_memory():
+    """Bytes of memory available to this process right now, or None if unknown"""
+    available = None
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    available = int(line.split()[1]) * 1024
+                    break
+    except (OSError, ValueError):
+        pass
+
+    if available is not None:
+        # Inside a container the cgroup limit is usually the tighter one
+        try:
+            with open("/sys/fs/cgroup/memory.max", "r") as f:
+                limit = f.read().strip()
+            with open("/sys/fs/cgroup/memory.current", "r") as f:
+                current = int(f.read().strip())
+            if limit != "max":
+                available = min(available, max(0, int(limit) - current))
+        except (OSError, ValueError):
+            pass
+        return available
+
+    if sys.platform == "win32":
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                        ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                        ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                        ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                        ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(status)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullAvailPhys
+        return None
+
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def default_budget():
+    """DEFAULT_BUDGET_FRACTION of the available memory"""
+    available = available_memory()
+    if not available:
+        return FALLBACK_BUDGET
+    return int(available * DEFAULT_BUDGET_FRACTION)
+
+
+def estimate_image_cost(width, height, colorspace, smask=0):
+    """Bytes to decode one image from its get_images() entry (width, height, colorspace name, smask xref)"""
+    colorspace = (colorspace or "").lower()
+    if "gray" in colorspace:
+        components = 1
+    elif "cmyk" in colorspace:
+        components = 4
+    else:
+        components = 3
+    if smask:
+        components += 1
+    return max(1, width) * max(1, height) * components * PIXEL_COPIES
+
+
+def estimate_page_cost(page, dpi=None, images=True):
+    """
+    Bytes a page needs while being processed: its RGB rendering at dpi (no
+    rendering if dpi is None) plus the decoded size of every image it uses.
+    """
+    cost = 0
+    if dpi:
+        zoom = dpi / 72.0
+        rect = page.rect
+        cost += (int(abs(rect.width) * zoom) + 1) * (int(abs(rect.height) * zoom) + 1) * 3 * PIXEL_COPIES
+    if images:
+        for img in page.get_images():
+            cost += estimate_image_cost(img[2], img[3], img[5], img[1])
+    return cost
+
+
+class MemoryBudget:
+    """
+    Estimated bytes in flight, capped at limit.
+
+        budget = MemoryBudget(512 << 20)
+        budget.acquire(cost)   # blocks until the item fits
+        ...                    # decode / render / encode
+        budget.release(cost)
+    """
+
+    def __init__(self, limit=None):
+        self.limit = max(1, int(limit or default_budget()))
+        self.in_use = 0
+        self.peak = 0
+        self.waits = 0
+        self.oversized = 0
+        self._cond = threading.Condition()
+
+    def _fits(self, cost):
+        # An item larger than the whole budget runs once nothing else does
+        return self.in_use == 0 or self.in_use + cost <= self.limit
+
+    def _take(self, cost):
+        self.in_use += cost
+        self.peak = max(self.peak, self.in_use)
+        if cost > self.limit:
+            self.oversized += 1
+
+    def acquire(self, cost):
+        with self._cond:
+            if not self._fits(cost):
+                self.waits += 1
+                self._cond.wait_for(lambda: self._fits(cost))
+            self._take(cost)
+
+    def try_acquire(self, cost):
+        """acquire() without waiting; returns whether the cost was taken"""
+        with self._cond:
+            if not self._fits(cost):
+                return False
+            self._take(cost)
+            return True
+
+    def release(self, cost):
+        with self._cond:
+            self.in_use = max(0, self.in_use - cost)
+            self._cond.notify_all()
+
+    def stats(self):
+        return {"budget": self.limit, "peak": self.peak, "waits": self.waits, "oversized": self.oversized}
+
+
+def size_pool(costs, budget, workers=None, queue_depth=None):
+    """
+    Pick (workers, queue_depth) for run_pipeline from the estimated item
+    costs: the CPU-based default number of workers, and a queue deep enough
+    to keep them busy but no deeper than the typical (median) item fits the
+    budget. When only one typical item fits, the pipeline runs serially.
+    Values given by the caller are kept.
+    """
+    auto_workers = workers is None
+    if auto_workers:
+        workers = default_workers()
+    if queue_depth is not None or workers <= 0 or not costs:
+        return workers, queue_depth
+
+    typical = max(1, sorted(costs)[len(costs) // 2])
+    fitting = max(1, budget.limit // typical)
+    if auto_workers and fitting < 2:
+        return 0, None
+    queue_depth = min(2 * workers, fitting)
+    if auto_workers:
+        workers = min(workers, queue_depth)
+    return workers, queue_depth
@@ -0,0 +1,159 @@
+##
+ # LocalPDF Studio - Offline PDF Toolkit
+ # ======================================
+ #
+ # @author      Md. Alinur Hossain <alinur1160@gmail.com>
+ # @license     AGPL 3.0 (GNU Affero General Public License version 3)
+ # @website     https://alinur1.github.io/LocalPDF_Studio_Website/
+ # @repository  https://github.com/Alinur1/LocalPDF_Studio
+ #
+ # Copyright (c) 2025 Md. Alinur Hossain. All rights reserved.
+ #
+ # Architecture:
+ # - Frontend: Electron + HTML/CSS/JS
+ # - Backend: ASP.NET Core Web API, Python
+ # - PDF Engine: PdfSharp + Mozilla PDF.js
+##
+
+"""
+Scratch space for jobs that stage intermediate files.
+
+Every job gets its own directory (<root>/<prefix>_<pid>_<random>), so jobs
+run by several processes, or by several threads of one process, never
+share files. The root is a memory-backed tmpfs (/dev/shm) when one with
+enough free space exists, else the system temp directory; the
+LOCALPDF_SCRATCH_DIR environment variable overrides both.
+
+The directory is removed when the job's ScratchSpace is closed, when it
+is garbage collected and at interpreter exit, whichever comes first.
+Directories left by killed processes are removed once they are older than
+SCRATCH_MAX_AGE_S. has_room() lets a job hold back new work while its
+quota is used up or the filesystem is close to full.
+
+    with ScratchSpace("batch", quota=2 << 30) as scratch:
+        folder = scratch.mkdir("chunk_1")
+        ...
+"""
+
+import os
+import shutil
+import time
+import weakref
+
+SCRATCH_ENV = "LOCALPDF_SCRATCH_DIR"
+SCRATCH_DIR_NAME = "localpdf_scratch"
+TMPFS_CANDIDATES = ["/dev/shm"]
+TMPFS_MIN_FREE = 512 << 20      # only use a tmpfs with at least this much free
+TMPFS_QUOTA_FRACTION = 0.25     # default quota on a tmpfs (it is RAM): share of its free space
+MIN_FREE_BYTES = 256 << 20      # keep this much free on the scratch filesystem
+SCRATCH_MAX_AGE_S = 24 * 3600
+
+
+def scratch_root(prefer_memory=True):
+    """Return (directory, on_tmpfs) for scratch directories"""
+    override = os.environ.get(SCRATCH_ENV)
+    if override:
+        return override, False
+    if prefer_memory:
+        for candidate in TMPFS_CANDIDATES:
+            try:
+                if os.access(candidate, os.W_OK) and shutil.disk_usage(candidate).free >= TMPFS_MIN_FREE:
+                    return os.path.join(candidate, SCRATCH_DIR_NAME), True
+            except OSError:
+                continue
+
+    import tempfile
+
+    return os.path.join(tempfile.gettempdir(), SCRATCH_DIR_NAME), False
+
+
+def cleanup_stale_scratch(root, max_age_s=SCRATCH_MAX_AGE_S):
+    """Remove scratch directories untouched for max_age_s seconds; returns how many were removed"""
+    if not os.path.isdir(root):
+        return 0
+    cutoff = time.time() - max_age_s
+    removed = 0
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        try:
+            if not os.path.isdir(path) or os.path.getmtime(path) >= cutoff:
+                continue
+        except OSError:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        removed += 1
+    return removed
+
+
+class ScratchSpace:
+    """
+    A unique scratch directory for one job, with an optional quota in bytes.
+    On a tmpfs the quota defaults to TMPFS_QUOTA_FRACTION of its free space.
+    """
+
+    def __init__(self, prefix="job", quota=None, root=None, prefer_memory=True):
+        import tempfile
+
+        on_tmpfs = False
+        if root is None:
+            root, on_tmpfs = scratch_root(prefer_memory)
+        os.makedirs(root, exist_ok=True)
+        cleanup_stale_scratch(root)
+
+        self.path = tempfile.mkdtemp(prefix=f"{prefix}_{os.getpid()}_", dir=root)
+        self.on_tmpfs = on_tmpfs
+        if quota is None and on_tmpfs:
+            quota = int(shutil.disk_usage(root).free * TMPFS_QUOTA_FRACTION)
+        self.quota = quota
+        self.peak = 0
+        self.held_back = 0
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.path, True)
+
+    def mkdir(self, name):
+        path = os.path.join(self.path, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def used(self):
+        """Bytes currently stored under the scratch directory"""
+        total = 0
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        self.peak = max(self.peak, total)
+        return total
+
+    def has_room(self, nbytes=0):
+        """
+        Whether nbytes more fit the quota while the filesystem keeps
+        MIN_FREE_BYTES free. Callers hold back new work (and count it) while
+        this is False and some of their running work will free space.
+        """
+        if self.quota is not None and self.used() + nbytes > self.quota:
+            self.held_back += 1
+            return False
+        try:
+            free = shutil.disk_usage(self.path).free
+        except OSError:
+            return True
+        if free - nbytes < MIN_FREE_BYTES:
+            self.held_back += 1
+            return False
+        return True
+
+    def stats(self):
+        return {"tmpfs": self.on_tmpfs, "quota": self.quota, "peak": self.peak, "held_back": self.held_back}
+
+    def close(self):
+        """Remove the directory and everything in it"""
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
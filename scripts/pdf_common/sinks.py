@@ -0,0 +1,206 @@
+##
+ # LocalPDF Studio - Offline PDF Toolkit
+ # ======================================
+ #
+ # @author      Md. Alinur Hossain <alinur1160@gmail.com>
+ # @license     AGPL 3.0 (GNU Affero General Public License version 3)
+ # @website     https://alinur1.github.io/LocalPDF_Studio_Website/
+ # @repository  https://github.com/Alinur1/LocalPDF_Studio
+ #
+ # Copyright (c) 2025 Md. Alinur Hossain. All rights reserved.
+ #
+ # Architecture:
+ # - Frontend: Electron + HTML/CSS/JS
+ # - Backend: ASP.NET Core Web API, Python
+ # - PDF Engine: PdfSharp + Mozilla PDF.js
+##
+
+"""
+Output sinks for tools that produce many files (one image per page).
+
+Every sink takes named byte blobs through add() and writes them out right
+away, so the first page is on disk (or on the pipe) while later pages are
+still being rendered and nothing is staged in a temp folder first.
+
+    with open_sink("zip", "out.zip") as sink:
+        sink.add("page_001.png", data)
+"""
+
+import io
+import os
+import sys
+import time
+
+SINK_MODES = ["zip", "dir", "zip-stream", "tar-stream"]
+
+_stdout_binary = None
+
+
+def claim_stdout():
+    """
+    Reserve the real stdout for binary output and point fd 1 at stderr.
+
+    Anything else that writes to stdout afterwards (print(), library
+    warnings, MuPDF messages from C) ends up on stderr instead of corrupting
+    the stream. Call it before importing PyMuPDF. Returns the binary stream.
+    """
+    global _stdout_binary
+    if _stdout_binary is None:
+        sys.stdout.flush()
+        _stdout_binary = os.fdopen(os.dup(1), "wb")
+        os.dup2(2, 1)
+    return _stdout_binary
+
+
+class OutputSink:
+    """Base class: named files in, written in the order they are added"""
+
+    def __init__(self, target):
+        self.target = target
+        self.entries = 0
+        self.bytes_written = 0
+
+    def add(self, name, data):
+        self._write(name, data)
+        self.entries += 1
+        self.bytes_written += len(data)
+
+    def _write(self, name, data):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def abort(self):
+        """Called instead of close() when the job failed"""
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class DirectorySink(OutputSink):
+    """Plain files under a directory; names may contain '/' subfolders"""
+
+    def __init__(self, target):
+        super().__init__(target)
+        os.makedirs(target, exist_ok=True)
+
+    def _write(self, name, data):
+        path = os.path.join(self.target, *name.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+
+class _StreamOutput(OutputSink):
+    """Sink writing to a path, or to stdout when the target is "-" """
+
+    def __init__(self, target):
+        super().__init__(target)
+        self._file = None if target == "-" else open(target, "wb")
+        self.stream = claim_stdout() if self._file is None else self._file
+
+    def _release(self):
+        if self._file is not None:
+            self._file.close()
+        else:
+            self.stream.flush()
+
+
+class ZipSink(_StreamOutput):
+    """
+    ZIP archive on a file path, a named pipe or stdout ("-").
+
+    Images are already compressed, so entries are stored rather than
+    deflated: deflating JPEG/PNG data costs a lot of CPU for almost no gain.
+    zipfile handles non-seekable streams by writing data descriptors.
+    """
+
+    def __init__(self, target, compression=None):
+        import zipfile
+
+        super().__init__(target)
+        try:
+            self._zip = zipfile.ZipFile(self.stream, "w", zipfile.ZIP_STORED if compression is None else compression)
+        except Exception:
+            self._release()
+            raise
+
+    def _write(self, name, data):
+        self._zip.writestr(name, data)
+
+    def close(self):
+        try:
+            self._zip.close()
+        finally:
+            self._release()
+
+    def abort(self):
+        self.close()
+        if self._file is not None and os.path.isfile(self.target):
+            # Don't leave a truncated archive behind
+            try:
+                os.remove(self.target)
+            except OSError:
+                pass
+
+
+class TarStreamSink(_StreamOutput):
+    """Uncompressed tar written as a stream (mode 'w|'), never seeking back"""
+
+    def __init__(self, target):
+        import tarfile
+
+        super().__init__(target)
+        try:
+            self._tar = tarfile.open(fileobj=self.stream, mode="w|")
+        except Exception:
+            self._release()
+            raise
+
+    def _write(self, name, data):
+        import tarfile
+
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        try:
+            self._tar.close()
+        finally:
+            self._release()
+
+    def abort(self):
+        self.close()
+        if self._file is not None and os.path.isfile(self.target):
+            # close() wrote the end-of-archive marker; don't leave a complete-looking partial tar
+            try:
+                os.remove(self.target)
+            except OSError:
+                pass
+
+
+def open_sink(mode, target):
+    """
+    Create a sink for one of SINK_MODES. "zip" and "zip-stream" only differ
+    in that the stream mode accepts "-" for stdout; both write as they go.
+    """
+    if mode == "dir":
+        return DirectorySink(target)
+    if mode in ("zip", "zip-stream"):
+        if mode == "zip" and target == "-":
+            raise ValueError("Use --output-mode zip-stream to write the ZIP to stdout")
+        return ZipSink(target)
+    if mode == "tar-stream":
+        return TarStreamSink(target)
+    raise ValueError(f"Unsupported output mode: {mode}")
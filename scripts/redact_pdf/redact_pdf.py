@@ -5,10 +5,18 @@ Permanently removes content from specified areas (secure redaction)
 Licensed under AGPLv3
 """
 
+import os
 import sys
 import json
+import math
 import argparse
-import fitz  # PyMuPDF
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from pdf_common.doc_loader import open_document
+
+
+IMAGE_MODES = ["remove", "pixels"]
 
 
 def hex_to_rgb(hex_color):
@@ -18,76 +26,196 @@ def hex_to_rgb(hex_color):
     return (r / 255.0, g / 255.0, b / 255.0)
 
 
-def apply_redactions(input_path, output_path, redactions):
+def _pixels_blanked(doc, info, rects):
+    """True if every pixel of the image the rects overlap, even partly, holds one flat value"""
+    import fitz  # PyMuPDF
+    from PIL import Image
+
+    if not info["xref"]:
+        # Inline image: no object to decode on its own, so it can't be verified
+        return False
+    pix = fitz.Pixmap(doc, info["xref"])
+    if pix.colorspace and pix.colorspace.n not in (1, 3):
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
+    img = Image.frombytes("L" if pix.n == 1 else "RGB", (pix.width, pix.height), pix.samples)
+    to_unit = ~fitz.Matrix(info["transform"])
+    bbox = fitz.Rect(info["bbox"])
+
+    for rect in rects:
+        covered = (rect & bbox) * to_unit
+        area = (max(0, math.floor(covered.x0 * pix.width)), max(0, math.floor(covered.y0 * pix.height)),
+                min(pix.width, math.ceil(covered.x1 * pix.width)), min(pix.height, math.ceil(covered.y1 * pix.height)))
+        if area[2] <= area[0] or area[3] <= area[1]:
+            continue
+        extrema = img.crop(area).getextrema()
+        if pix.n == 1:
+            extrema = [extrema]
+        if any(low != high for low, high in extrema):
+            return False
+    return True
+
+
+def verify_redactions(doc, rects_by_page, image_mode="remove"):
+    """
+    Look for content left under the redaction boxes of the saved document.
+
+    Only redacted pages are read, and text is only extracted inside the
+    area the boxes cover. A character counts as left over when its center
+    lies in a box, the rule MuPDF uses to remove it. An image counts when it
+    touches a box in "remove" mode, or when its pixels under a box are not
+    all one value in "pixels" mode.
+    """
+    import fitz  # PyMuPDF
+
+    leftover_text = []
+    leftover_images = []
+    for page_num, rects in sorted(rects_by_page.items()):
+        page = doc[page_num - 1]
+        clip = fitz.Rect(rects[0])
+        for rect in rects[1:]:
+            clip |= rect
+
+        # Plain tuples: fitz.Point/Rect tests cost microseconds per character
+        boxes = [tuple(rect) for rect in rects]
+        chars = []
+        for block in page.get_text("rawdict", clip=clip, flags=0)["blocks"]:
+            for line in block.get("lines", []):
+                for span in line["spans"]:
+                    for char in span["chars"]:
+                        if char["c"].isspace():
+                            continue
+                        x0, y0, x1, y1 = char["bbox"]
+                        x, y = (x0 + x1) / 2, (y0 + y1) / 2
+                        if any(bx0 <= x < bx1 and by0 <= y < by1 for bx0, by0, bx1, by1 in boxes):
+                            chars.append(char["c"])
+        if chars:
+            leftover_text.append({"page": page_num, "text": "".join(chars)})
+
+        for info in page.get_image_info(xrefs=True):
+            bbox = fitz.Rect(info["bbox"])
+            covered = [rect for rect in rects if not (bbox & rect).is_empty]
+            if not covered:
+                continue
+            if image_mode == "remove" or not _pixels_blanked(doc, info, covered):
+                leftover_images.append({"page": page_num, "xref": info["xref"]})
+
+    return {
+        "passed": not leftover_text and not leftover_images,
+        "pages_checked": len(rects_by_page),
+        "boxes_checked": sum(len(rects) for rects in rects_by_page.values()),
+        "leftover_text": leftover_text,
+        "leftover_images": leftover_images
+    }
+
+
+def apply_redactions(input_path, output_path, redactions, image_mode="remove", verify=False):
     """
     Apply redactions to PDF using PyMuPDF's secure redaction feature.
     This permanently removes content - it cannot be recovered.
+
+    image_mode decides what happens to images under a redaction box:
+    "remove" drops every image the box touches, "pixels" blanks only the
+    covered pixels and keeps the rest of the image (scanned pages stay
+    readable and don't need to be OCRed again).
+
+    With verify, the document is saved to memory and reopened, and the
+    redacted areas are checked for leftover text and images (see
+    verify_redactions). The output is only written if nothing was found.
     """
     try:
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+        if image_mode not in IMAGE_MODES:
+            raise ValueError(f"Unsupported image mode: {image_mode}")
+
+        import fitz  # PyMuPDF
+
+        image_option = fitz.PDF_REDACT_IMAGE_PIXELS if image_mode == "pixels" else fitz.PDF_REDACT_IMAGE_REMOVE
+
         # Open PDF
-        doc = fitz.open(input_path)
-        total_redactions = 0
-        pages_redacted = set()
-
-        # Group redactions by page for efficiency
-        redactions_by_page = {}
-        for redaction in redactions:
-            page_num = redaction['page']
-            if page_num not in redactions_by_page:
-                redactions_by_page[page_num] = []
-            redactions_by_page[page_num].append(redaction)
-
-        # Apply redactions page by page
-        for page_num, page_redactions in redactions_by_page.items():
-            # Validate page number
-            if page_num < 1 or page_num > len(doc):
-                print(f"Warning: Page {page_num} out of range (1-{len(doc)}), skipping", file=sys.stderr)
-                continue
+        with open_document(input_path, readonly=False) as doc:
+            total_redactions = 0
+            pages_redacted = set()
+            rects_by_page = {}
+
+            # Group redactions by page for efficiency
+            redactions_by_page = {}
+            for redaction in redactions:
+                page_num = redaction['page']
+                if page_num not in redactions_by_page:
+                    redactions_by_page[page_num] = []
+                redactions_by_page[page_num].append(redaction)
 
-            page = doc[page_num - 1]  # PyMuPDF uses 0-based indexing
-            page_width = page.rect.width
-            page_height = page.rect.height
+            # Apply redactions page by page
+            for page_num, page_redactions in redactions_by_page.items():
+                # Validate page number
+                if page_num < 1 or page_num > len(doc):
+                    print(f"Warning: Page {page_num} out of range (1-{len(doc)}), skipping", file=sys.stderr)
+                    continue
 
-            # Apply each redaction on this page
-            for redact in page_redactions:
-                try:
-                    # Convert normalized coordinates (0-1) to absolute coordinates
-                    x0 = redact['x'] * page_width
-                    y0 = redact['y'] * page_height
-                    x1 = x0 + (redact['width'] * page_width)
-                    y1 = y0 + (redact['height'] * page_height)
+                page = doc[page_num - 1]  # PyMuPDF uses 0-based indexing
+                page_width = page.rect.width
+                page_height = page.rect.height
 
-                    # Create rectangle for redaction area
-                    rect = fitz.Rect(x0, y0, x1, y1)
+                # Apply each redaction on this page
+                for redact in page_redactions:
+                    try:
+                        # Convert normalized coordinates (0-1) to absolute coordinates
+                        x0 = redact['x'] * page_width
+                        y0 = redact['y'] * page_height
+                        x1 = x0 + (redact['width'] * page_width)
+                        y1 = y0 + (redact['height'] * page_height)
 
-                    # Convert color from hex to RGB
-                    fill_color = hex_to_rgb(redact['color'])
+                        # Create rectangle for redaction area
+                        rect = fitz.Rect(x0, y0, x1, y1)
 
-                    # Add redaction annotation
-                    # This marks the area for redaction
-                    annot = page.add_redact_annot(rect, fill=fill_color)
+                        # Convert color from hex to RGB
+                        fill_color = hex_to_rgb(redact['color'])
 
-                    total_redactions += 1
+                        # Add redaction annotation
+                        # This marks the area for redaction
+                        annot = page.add_redact_annot(rect, fill=fill_color)
+                        rects_by_page.setdefault(page_num, []).append(rect)
 
-                except Exception as e:
-                    print(f"Error applying redaction on page {page_num}: {str(e)}", file=sys.stderr)
-                    continue
+                        total_redactions += 1
 
-            # Apply all redactions on this page
-            # This is the critical step - it PERMANENTLY removes the content
-            # After this, the text/images in redacted areas cannot be recovered
-            page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_REMOVE, graphics=fitz.PDF_REDACT_IMAGE_REMOVE)
-            pages_redacted.add(page_num)
-
-        # Save the redacted PDF
-        # Use garbage collection and deflate to optimize file size
-        doc.save(
-            output_path,
-            garbage=4,  # Maximum garbage collection
-            deflate=True,  # Compress streams
-            clean=True  # Clean up unused objects
-        )
-        doc.close()
+                    except Exception as e:
+                        print(f"Error applying redaction on page {page_num}: {str(e)}", file=sys.stderr)
+                        continue
+
+                # Apply all redactions on this page
+                # This is the critical step - it PERMANENTLY removes the content
+                # After this, the text/images in redacted areas cannot be recovered
+                page.apply_redactions(images=image_option, graphics=fitz.PDF_REDACT_IMAGE_REMOVE)
+                pages_redacted.add(page_num)
+
+            # Save the redacted PDF
+            # Use garbage collection and deflate to optimize file size
+            if verify:
+                # Check exactly the bytes that will be written
+                pdf_data = doc.tobytes(garbage=4, deflate=True, clean=True)
+                with fitz.open(stream=pdf_data, filetype="pdf") as saved:
+                    verification = verify_redactions(saved, rects_by_page, image_mode)
+                if not verification["passed"]:
+                    leftovers = len(verification["leftover_text"]) + len(verification["leftover_images"])
+                    print(json.dumps({
+                        "success": False,
+                        "error": f"Verification found content left under redactions ({leftovers} findings); "
+                                 "the output was not written",
+                        "verification": verification
+                    }))
+                    return 1
+                with open(output_path, "wb") as f:
+                    f.write(pdf_data)
+            else:
+                doc.save(
+                    output_path,
+                    garbage=4,  # Maximum garbage collection
+                    deflate=True,  # Compress streams
+                    clean=True  # Clean up unused objects
+                )
 
         # Return success result as JSON
         result = {
@@ -95,8 +223,11 @@ def apply_redactions(input_path, output_path, redactions):
             "total_redactions": total_redactions,
             "pages_redacted": len(pages_redacted),
             "pages_list": sorted(list(pages_redacted)),
+            "image_mode": image_mode,
             "output_file": output_path
         }
+        if verify:
+            result["verification"] = verification
 
         print(json.dumps(result))
         return 0
@@ -148,6 +279,19 @@ Redaction format (normalized coordinates 0-1):
         help='JSON file containing array of redaction objects'
     )
     
+    parser.add_argument(
+        '--image-mode',
+        choices=IMAGE_MODES,
+        default='remove',
+        help='remove: drop images touched by a redaction; pixels: blank only the covered pixels'
+    )
+
+    parser.add_argument(
+        '--verify',
+        action='store_true',
+        help='Re-read the saved output and fail if any text or image is left under a redaction'
+    )
+
     parser.add_argument(
         '--json',
         action='store_true',
@@ -188,7 +332,7 @@ Redaction format (normalized coordinates 0-1):
                 return 1
 
     # Apply redactions
-    return apply_redactions(args.input_pdf, args.output_pdf, redactions_data)
+    return apply_redactions(args.input_pdf, args.output_pdf, redactions_data, args.image_mode, args.verify)
 
 
 if __name__ == '__main__':